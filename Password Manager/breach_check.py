@@ -0,0 +1,240 @@
+"""
+Offline breached password check for MyPass.
+
+A HIBP style list of SHA-1 hashes ("HEX[:count]" per line) is preprocessed
+once into a sorted file of fixed-width 20 byte digests, sorted externally in
+bounded memory unless the input is already sorted. Lookups memory-map that
+file and search it by interpolation, falling back to binary search, so a
+check touches a handful of pages and never loads the corpus into RAM. An
+optional Bloom filter file next to it answers most negatives without
+touching the hash file at all.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Password%20Manager/breach_check.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import tempfile
+
+RECORD_SIZE = 20
+BLOOM_SUFFIX = '.bloom'
+BLOOM_HEADER = struct.Struct('<8sQI')
+BLOOM_MAGIC = b'MPBLOOM1'
+
+
+def _bloom_positions(digest: bytes, bits: int, hashes: int):
+    # Double hashing over two independent slices of the SHA-1 digest.
+    h1 = int.from_bytes(digest[:8], 'big')
+    h2 = int.from_bytes(digest[8:16], 'big') | 1
+    return ((h1 + i * h2) % bits for i in range(hashes))
+
+
+class BloomFilter:
+    __slots__ = '_file', '_map', '_bits', '_hashes'
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._bits, self._hashes = BLOOM_HEADER.unpack_from(self._map)
+        if magic != BLOOM_MAGIC:
+            self.close()
+            raise ValueError(f'{path!r} is not a Bloom filter file.')
+
+    def might_contain(self, digest: bytes) -> bool:
+        data = self._map
+        offset = BLOOM_HEADER.size
+        for position in _bloom_positions(digest, self._bits, self._hashes):
+            if not data[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+class BreachIndex:
+    __slots__ = '_file', '_map', '_count', '_bloom', 'stats'
+
+    INTERPOLATION_STEPS = 4
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size % RECORD_SIZE:
+            self._file.close()
+            raise ValueError(f'{path!r} is not a breach hash file.')
+
+        self._count = size // RECORD_SIZE
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._bloom = BloomFilter(path + BLOOM_SUFFIX) if os.path.exists(path + BLOOM_SUFFIX) else None
+        self.stats = {'lookups': 0, 'bloom_negatives': 0, 'hits': 0}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _search(self, digest: bytes) -> bool:
+        data = self._map
+        key = int.from_bytes(digest[:8], 'big')
+        lo, hi = 0, self._count - 1
+        lo_key, hi_key = 0, (1 << 64) - 1
+        steps = 0
+
+        while lo <= hi:
+            # Hashes are uniform, so interpolation lands next to the target in a few probes.
+            if steps < self.INTERPOLATION_STEPS and hi_key > lo_key:
+                mid = lo + (key - lo_key) * (hi - lo) // (hi_key - lo_key)
+                mid = min(max(mid, lo), hi)
+            else:
+                mid = (lo + hi) // 2
+            steps += 1
+
+            record = data[mid * RECORD_SIZE:(mid + 1) * RECORD_SIZE]
+            if record == digest:
+                return True
+            if record < digest:
+                lo = mid + 1
+                lo_key = int.from_bytes(record[:8], 'big')
+            else:
+                hi = mid - 1
+                hi_key = int.from_bytes(record[:8], 'big')
+        return False
+
+    def contains_digest(self, digest: bytes) -> bool:
+        self.stats['lookups'] += 1
+        if self._bloom and not self._bloom.might_contain(digest):
+            self.stats['bloom_negatives'] += 1
+            return False
+        found = self._search(digest)
+        self.stats['hits'] += found
+        return found
+
+    def is_breached(self, password: str) -> bool:
+        return self.contains_digest(hashlib.sha1(password.encode('utf-8')).digest())
+
+    def close(self) -> None:
+        if self._bloom:
+            self._bloom.close()
+        if self._count:
+            self._map.close()
+        self._file.close()
+
+
+def _parse_digests(lines, stats: dict):
+    for line in lines:
+        try:
+            digest = bytes.fromhex(line[:RECORD_SIZE * 2])
+        except ValueError:
+            digest = b''
+        if len(digest) == RECORD_SIZE:
+            yield digest
+        elif line.strip():
+            stats['invalid'] += 1
+
+
+def _read_records(path: str):
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(RECORD_SIZE * 4096)
+            if not block:
+                return
+            for i in range(0, len(block), RECORD_SIZE):
+                yield block[i:i + RECORD_SIZE]
+
+
+def _sorted_runs(digests, run_dir: str, run_records: int) -> list:
+    # Sorts the input in runs of run_records digests, each written to its own file.
+    runs = []
+    run = []
+    for digest in digests:
+        run.append(digest)
+        if len(run) >= run_records:
+            runs.append(_write_run(run, run_dir, len(runs)))
+            run = []
+    if run:
+        runs.append(_write_run(run, run_dir, len(runs)))
+    return runs
+
+
+def _write_run(run: list, run_dir: str, number: int) -> str:
+    run.sort()
+    path = os.path.join(run_dir, f'run{number:05d}')
+    with open(path, 'wb') as f:
+        f.write(b''.join(run))
+    return path
+
+
+def _check_sorted(digests):
+    previous = b''
+    for digest in digests:
+        if digest < previous:
+            raise ValueError('Input is not sorted by hash, build it without --presorted.')
+        previous = digest
+        yield digest
+
+
+def _write_bloom(hash_path: str, count: int, false_positive_rate: float) -> None:
+    bits = max(8, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+    bits = (bits + 7) // 8 * 8
+    hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+
+    bloom = bytearray(bits // 8)
+    for digest in _read_records(hash_path):
+        for position in _bloom_positions(digest, bits, hashes):
+            bloom[position >> 3] |= 1 << (position & 7)
+
+    tmp_path = hash_path + BLOOM_SUFFIX + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes))
+        f.write(bloom)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, hash_path + BLOOM_SUFFIX)
+
+
+def build(lines, out_path: str, presorted: bool = False, bloom_fp: float = None,
+          run_records: int = 10_000_000) -> dict:
+    # Builds the sorted, deduplicated hash file (and its Bloom filter) from "HEX[:count]" lines.
+    stats = {'records': 0, 'invalid': 0, 'duplicates': 0}
+    digests = _parse_digests(lines, stats)
+    tmp_path = out_path + '.tmp'
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(out_path))) as run_dir:
+        if presorted:
+            merged = _check_sorted(digests)
+        else:
+            merged = heapq.merge(*(_read_records(run) for run in _sorted_runs(digests, run_dir, run_records)))
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                previous = None
+                buffer = []
+                for digest in merged:
+                    if digest == previous:
+                        stats['duplicates'] += 1
+                        continue
+                    previous = digest
+                    buffer.append(digest)
+                    if len(buffer) >= 4096:
+                        f.write(b''.join(buffer))
+                        stats['records'] += len(buffer)
+                        buffer = []
+                f.write(b''.join(buffer))
+                stats['records'] += len(buffer)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    os.replace(tmp_path, out_path)
+    if bloom_fp:
+        _write_bloom(out_path, stats['records'], bloom_fp)
+    elif os.path.exists(out_path + BLOOM_SUFFIX):
+        os.remove(out_path + BLOOM_SUFFIX)
+    return stats
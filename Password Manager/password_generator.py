@@ -0,0 +1,86 @@
+"""
+Password generator for MyPass.
+
+Random bytes come from os.urandom in bulk. A 256-entry translation table
+maps each byte to a password character and deletes the bytes above the
+largest multiple of the alphabet size, which is rejection sampling without
+modulo bias done in C by bytes.translate. Passwords missing a required
+character class are rejected whole, so the result stays uniform over the
+passwords meeting the policy.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Password%20Manager/password_generator.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import os
+import string
+
+SYMBOLS = '#$%^,()*+.:|=?@/[]_`{}\\!;-~'
+CHAR_CLASSES = {
+    'lower': string.ascii_lowercase,
+    'upper': string.ascii_uppercase,
+    'digits': string.digits,
+    'symbols': SYMBOLS
+}
+
+
+class PasswordGenerator:
+    __slots__ = '_chars', '_table', '_delete', '_acceptance', '_required'
+
+    # Extra bytes drawn on top of the expected need, so a second draw is rare.
+    OVERDRAW = 1.05
+
+    def __init__(self, chars: str = ''.join(CHAR_CLASSES.values()), required=()) -> None:
+        chars = ''.join(dict.fromkeys(chars))
+        if not chars or max(map(ord, chars)) > 255:
+            raise ValueError('Characters must be a non-empty set of Latin-1 characters.')
+
+        size = len(chars)
+        limit = 256 - 256 % size
+        self._chars = chars
+        self._table = bytes(ord(chars[byte % size]) if byte < limit else 0 for byte in range(256))
+        self._delete = bytes(range(limit, 256))
+        self._acceptance = limit / 256
+
+        self._required = []
+        for char_class in required:
+            char_class = frozenset(char_class) & frozenset(chars)
+            if not char_class:
+                raise ValueError('Every required class must share characters with the alphabet.')
+            self._required.append(char_class)
+
+    @property
+    def chars(self) -> str:
+        return self._chars
+
+    def _random_chars(self, count: int) -> str:
+        chunks = []
+        missing = count
+        while missing > 0:
+            chunk = os.urandom(int(missing / self._acceptance * self.OVERDRAW) + 16)
+            chunk = chunk.translate(self._table, self._delete)
+            chunks.append(chunk)
+            missing -= len(chunk)
+        return b''.join(chunks)[:count].decode('latin-1')
+
+    def generate_many(self, length: int, count: int) -> list:
+        if length < 1:
+            raise ValueError('Length must be at least 1.')
+        if length < len(self._required):
+            raise ValueError(f'Length must be at least {len(self._required)} to fit every required class.')
+        if count < 0:
+            raise ValueError('Count cannot be negative.')
+
+        passwords = []
+        while len(passwords) < count:
+            missing = count - len(passwords)
+            chars = self._random_chars(missing * length)
+            batch = [chars[i:i + length] for i in range(0, missing * length, length)]
+            for char_class in self._required:
+                isdisjoint = char_class.isdisjoint
+                batch = [password for password in batch if not isdisjoint(password)]
+            passwords.extend(batch)
+        return passwords
+
+    def generate(self, length: int) -> str:
+        return self.generate_many(length, 1)[0]
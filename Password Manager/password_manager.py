@@ -5,17 +5,39 @@ MyPass is a password manager with GUI.
 :Author: NanthaKumar<https://github.com/nknantha>
 :Date: 2021/09/25
 """
-import json
-import random
-import string
 from tkinter import *
-from tkinter import ttk, messagebox, font
+import os
+from collections import Counter
+from tkinter import ttk, messagebox, font, simpledialog
+
+from breach_check import BreachIndex
+from password_generator import CHAR_CLASSES, PasswordGenerator
+from site_completer import SiteCompleter
+from vault_audit import audit
+from vault_crypto import DecryptionError, EncryptedStorage, KeySession
+from vault_storage import VaultWriter, legacy_rows, open_storage
 
 
 class MyPass:
 
     TITLE = 'nPassM'
     DATA_FILE = 'data.json'
+    KEY_FILE = 'vault.key'
+
+    # Sorted hash file built with "vault_cli.py breach-build", the check is skipped when missing.
+    BREACH_FILE = 'breached.bin'
+
+    # Master key configurations, in seconds.
+    UNLOCK_SECONDS = 0.5
+    IDLE_TIMEOUT = 300
+
+    # Storage backend, one of the STORAGE_FILES keys.
+    STORAGE_BACKEND = 'log'
+    STORAGE_FILES = {
+        'json': DATA_FILE,
+        'log': 'data.log',
+        'sqlite': 'data.db'
+    }
 
     WID_PAD_X = 5
     WID_PAD_Y = 5
@@ -23,16 +45,51 @@ class MyPass:
     ROOT_PAD_X = 30
     ROOT_PAD_Y = 30
 
-    PS_CHARS = string.ascii_letters + string.digits + '#$%^,()*+.:|=?@/[]_`{}\\!;-~'
+    SUGGEST_DELAY_MS = 120
+    WRITER_POLL_MS = 50
+    COMPLETER_CHUNK = 1000
+    SUGGEST_LIMIT = 6
+    AUDIT_LIMIT = 50
+
+    PS_CHARS = ''.join(CHAR_CLASSES.values())
+    PS_REQUIRED = tuple(CHAR_CLASSES.values())
 
     def __init__(self):
 
+        # Setup vault, the legacy JSON file is migrated into it on the first unlock.
+        self._session = KeySession(self.KEY_FILE, self.IDLE_TIMEOUT)
+        self._vault = EncryptedStorage(open_storage(self.STORAGE_FILES[self.STORAGE_BACKEND],
+                                                    self.STORAGE_BACKEND), self._session)
+        self._migrated = False
+        self._writer = VaultWriter(self._vault)
+
+        # Setup password generator.
+        self._generator = PasswordGenerator(self.PS_CHARS, required=self.PS_REQUIRED)
+
+        # Setup offline breach check.
+        self._breaches = BreachIndex(self.BREACH_FILE) if os.path.exists(self.BREACH_FILE) else None
+
+        # Setup site autocomplete, indexed a chunk at a time once the window is up.
+        self._completer = SiteCompleter()
+        self._completer_version = self.__vault_version()
+        self._pending_sites, self._sites_position = self._vault.sites_since(0)
+        self._pending_start = 0
+        self._feed_job = None
+        self._suggest_job = None
+
         # Setup window.
         self._root = Tk()
         self._root.title(self.TITLE)
         self._root.configure(padx=self.ROOT_PAD_X, pady=self.ROOT_PAD_Y)
         self._root.resizable(0, 0)
 
+        # Setup Menu.
+        self._menu = Menu(master=self._root)
+        self._tools_menu = Menu(master=self._menu, tearoff=0)
+        self._tools_menu.add_command(label='Audit Vault', command=self.__audit)
+        self._menu.add_cascade(label='Tools', menu=self._tools_menu)
+        self._root.configure(menu=self._menu)
+
         # Setup Logo.
         self._image_file = PhotoImage(file='Images/logo.png')
         ttk.Label(master=self._root, image=self._image_file).grid(column=0, row=0,
@@ -113,9 +170,31 @@ class MyPass:
         self._clear_button = ttk.Button(master=self._button_frame, text='Clear', command=self.__clear_entry)
         self._clear_button.pack(expand=True, fill=X, side=LEFT)
 
+        # Write Status Label.
+        self._status_label = ttk.Label(master=self._root, text='', font=new_font)
+        self._status_label.grid(column=1, row=5, padx=self.WID_PAD_X, columnspan=2, sticky=W)
+
+        # Site Suggestions, shown below the site entry while typing.
+        self._suggestion_list = Listbox(master=self._root, height=self.SUGGEST_LIMIT, activestyle='dotbox')
+        self._site_entry.bind('<KeyRelease>', self.__schedule_suggestions)
+        self._site_entry.bind('<Down>', self.__focus_suggestions)
+        self._site_entry.bind('<Escape>', lambda event: self.__hide_suggestions())
+        self._suggestion_list.bind('<Return>', self.__pick_suggestion)
+        self._suggestion_list.bind('<Double-Button-1>', self.__pick_suggestion)
+        self._suggestion_list.bind('<Escape>', self.__pick_suggestion)
+
         # Window mainloop.
+        self._root.after_idle(self.__unlock)
+        self._root.after(self.WRITER_POLL_MS, self.__poll_writer)
+        self._feed_job = self._root.after_idle(self.__feed_completer)
         self._root.mainloop()
 
+        # Flush the pending writes before closing the vault.
+        self._writer.close()
+        self._vault.close()
+        if self._breaches:
+            self._breaches.close()
+
     def __add_entry(self):
 
         entries = [entry.get().strip() for entry in (self._site_entry,
@@ -134,43 +213,118 @@ class MyPass:
             messagebox.showerror('Error', '\n'.join(error))
             return
 
+        if not self.__unlock():
+            return
+
+        if self.__is_breached(entries[2]) and not messagebox.askyesno(
+                'Breached Password', 'This password appears in a known data breach.\nSave it anyway?',
+                icon='warning'):
+            return
+
         confirmation_msg = 'Site: ' + entries[0] \
                            + '\nUsername: ' + entries[1] \
                            + '\nPassword: ' + entries[2]
         if messagebox.askokcancel('Confirmation', 'Verify Details:\n' + confirmation_msg):
-            messagebox.showinfo('Success', 'Credentials saved successfully.')
+            self._writer.submit(*entries, callback=lambda index, error: self.__on_saved(entries, error))
+            self.__update_status()
+            self.__clear_entry()
 
+    def __unlock(self):
+        if self._session.check_idle():
+            return True
+
+        if not self._session.exists():
+            passphrase = simpledialog.askstring('Create Vault', 'New master password:',
+                                                show='*', parent=self._root)
+            if not passphrase:
+                return False
+            if simpledialog.askstring('Create Vault', 'Repeat master password:',
+                                      show='*', parent=self._root) != passphrase:
+                messagebox.showerror('Error', 'Master passwords do not match.')
+                return False
+            self._session.create(passphrase, self.UNLOCK_SECONDS)
+        else:
+            passphrase = simpledialog.askstring('Unlock Vault', 'Master password:', show='*', parent=self._root)
+            if passphrase is None:
+                return False
+            if not self._session.unlock(passphrase):
+                messagebox.showerror('Error', 'Wrong master password.')
+                return False
+
+        if not self._migrated:
+            self.__migrate()
+        return True
+
+    def __migrate(self):
+        # Encrypt the entries saved in the clear, then move the legacy JSON file into the vault.
+        try:
+            self._vault.encrypt_plaintext()
+        except (OSError, ValueError) as e:
+            messagebox.showerror('Error', f'Entries saved in the clear could not be encrypted:\n{e}')
+            return
+
+        if self.STORAGE_BACKEND != 'json' and os.path.exists(self.DATA_FILE):
             try:
-                with open(self.DATA_FILE) as f:
-                    json_data = json.load(f)
-            except (FileNotFoundError, json.decoder.JSONDecodeError):
-                json_data = dict()
-
-            index = '0'
-            if json_data.get(entries[0]):
-                index = str(len(json_data[entries[0]]))
-                json_data[entries[0]].update({
-                    index: {
-                        'Username': entries[1],
-                        'Password': entries[2]
-                    }
-                })
+                rows = legacy_rows(self.DATA_FILE)
+
+                # Skip what an earlier, interrupted migration already saved.
+                stored = dict()
+                missing = []
+                for site, username, password in rows:
+                    if site not in stored:
+                        try:
+                            entries = self._vault.get(site).values()
+                        except KeyError:
+                            entries = ()
+                        stored[site] = Counter((entry['Username'], entry['Password']) for entry in entries)
+                    if stored[site][username, password]:
+                        stored[site][username, password] -= 1
+                    else:
+                        missing.append((site, username, password))
+
+                if missing:
+                    self._vault.add_many(missing)
+                os.remove(self.DATA_FILE)
+            except (OSError, ValueError) as e:
+                messagebox.showwarning('Migration', f'{e}\n{self.DATA_FILE!r} was left in place, '
+                                                    f'the migration is tried again on the next unlock.')
+                return
+        self._migrated = True
+
+    def __on_saved(self, entries, error):
+        if error:
+            fields = (self._site_entry, self._username_entry, self._password_entry)
+            if not any(field.get().strip() for field in fields):
+                # Put the unsaved credentials back into the empty form, so they can be added again.
+                for field, text in zip(fields, entries):
+                    field.insert(0, text)
+                messagebox.showerror('Error', f'Credentials for {entries[0]!r} were not saved:\n{error}\n\n'
+                                              f'They are back in the form, add them again once fixed.')
             else:
-                json_data.update({
-                    entries[0]: {
-                        index: {
-                            'Username': entries[1],
-                            'Password': entries[2]
-                        }
-                    }
-                })
-
-            with open(self.DATA_FILE, 'w') as f:
-                json.dump(json_data, f, indent=4)
-
-            self.__clear_entry()
+                # The form holds a newer entry, show the unsaved credentials instead of overwriting it.
+                messagebox.showerror('Error', f'Credentials for {entries[0]!r} were not saved:\n{error}\n\n'
+                                              f'Username: {entries[1]}\nPassword: {entries[2]}')
+        else:
+            self._completer.add(entries[0])
+            messagebox.showinfo('Success', f'Credentials for {entries[0]!r} saved successfully.')
+
+    def __poll_writer(self):
+        self._writer.poll()
+        self.__update_status()
+        self._root.after(self.WRITER_POLL_MS, self.__poll_writer)
+
+    def __update_status(self):
+        status = []
+        if self._writer.pending:
+            status.append(f'Saving {self._writer.pending} entries...')
+        if self._writer.failed:
+            status.append(f'{self._writer.failed} failed: {self._writer.last_error}')
+        if not self._session.check_idle():
+            status.append('Vault locked.')
+        self._status_label.configure(text='  '.join(status))
 
     def __clear_entry(self):
+        self.__hide_suggestions()
         for entry in (self._site_entry, self._username_entry, self._password_entry):
             entry.delete(0, END)
 
@@ -180,30 +334,143 @@ class MyPass:
         self._root.update()
 
     def __generate(self):
-        new_password = ''
-        for _ in range(self._length_spinbox_variable.get()):
-            new_password += random.choice(self.PS_CHARS)
-
+        new_password = self._generator.generate(self._length_spinbox_variable.get())
         self._password_entry_variable.set(new_password)
+        if self.__is_breached(new_password):
+            messagebox.showwarning('Breached Password', 'The generated password appears in a known data breach, '
+                                                        'generate another one.')
+
+    def __is_breached(self, password):
+        return self._breaches is not None and self._breaches.is_breached(password)
 
     def __search(self):
-        try:
-            with open(self.DATA_FILE) as f:
-                json_data = json.load(f)
+        self.__hide_suggestions()
+
+        # Search by username, when only the username is given.
+        site = self._site_entry.get()
+        username = self._username_entry.get().strip()
+        if not site and username:
+            sites = self._vault.sites_for_username(username)
+            if sites:
+                messagebox.showinfo('Found', f'Sites using {username!r}:\n\n' + '\n'.join(sorted(sites)))
+            else:
+                messagebox.showerror('Error', f"{username!r} is not found.")
+            return
+
+        if not self.__unlock():
+            return
 
+        try:
             data = 'Credentials:'
-            query_data = json_data[self._site_entry.get()]
+            query_data = self._vault.get(site)
             for index in query_data:
                 data += f"\n\nIndex {int(index) + 1}:" \
                         f"\n    Username: {query_data[index]['Username']}" \
                         f"\n    Password: {query_data[index]['Password']}"
             messagebox.showinfo('Found', data)
-        except FileNotFoundError:
-            messagebox.showerror('Error', f"{'data.json'!r} file not found.")
-        except json.decoder.JSONDecodeError:
-            messagebox.showerror('Error', f"{'data.json'!r} file is corrupted.")
         except KeyError:
-            messagebox.showerror('Error', f"{self._site_entry.get()!r} is not found.")
+            messagebox.showerror('Error', f"{site!r} is not found.")
+        except DecryptionError as e:
+            messagebox.showerror('Error', f"{site!r} credentials cannot be decrypted: {e}")
+
+    def __audit(self):
+        if not self.__unlock():
+            return
+
+        self._root.configure(cursor='watch')
+        self._root.update_idletasks()
+        try:
+            report = audit(self._vault.entries(), self._breaches)
+        except DecryptionError as e:
+            messagebox.showerror('Error', f'The vault cannot be audited: {e}')
+            return
+        finally:
+            self._root.configure(cursor='')
+
+        # The report is too long for a message box.
+        window = Toplevel(master=self._root)
+        window.title('Vault Audit')
+        text = Text(master=window, wrap=NONE, width=100, height=30)
+        scrollbar = ttk.Scrollbar(master=window, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        text.insert(END, report.format(self.AUDIT_LIMIT))
+        text.configure(state=DISABLED)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        text.pack(expand=True, fill=BOTH)
+
+    def __vault_version(self):
+        return self._vault.stats['deltas'], self._vault.stats['reloads']
+
+    def __sync_completer(self):
+        # Pick up sites written to the vault by another writer, only the new ones are queued.
+        self._vault.refresh()
+        version = self.__vault_version()
+        if version != self._completer_version:
+            sites, self._sites_position = self._vault.sites_since(self._sites_position)
+            self._completer_version = version
+            if sites:
+                self._pending_sites = self._pending_sites[self._pending_start:] + sites
+                self._pending_start = 0
+                if not self._feed_job:
+                    self._feed_job = self._root.after_idle(self.__feed_completer)
+
+    def __feed_completer(self):
+        # Index the queued sites a chunk at a time, so typing stays responsive meanwhile.
+        end = self._pending_start + self.COMPLETER_CHUNK
+        self._completer.update(self._pending_sites[self._pending_start:end])
+        if end < len(self._pending_sites):
+            self._pending_start = end
+            self._feed_job = self._root.after(1, self.__feed_completer)
+        else:
+            self._pending_sites, self._pending_start = [], 0
+            self._feed_job = None
+
+    def __schedule_suggestions(self, event):
+        if event.keysym in ('Down', 'Up', 'Escape', 'Return'):
+            return
+
+        # Debounce, so fast typing computes the suggestions only once.
+        if self._suggest_job:
+            self._root.after_cancel(self._suggest_job)
+        self._suggest_job = self._root.after(self.SUGGEST_DELAY_MS, self.__show_suggestions)
+
+    def __show_suggestions(self):
+        self._suggest_job = None
+        self.__sync_completer()
+
+        text = self._site_entry.get().strip()
+        suggestions = self._completer.suggest(text, self.SUGGEST_LIMIT) if text else []
+        if not suggestions or suggestions == [text]:
+            self.__hide_suggestions()
+            return
+
+        self._suggestion_list.delete(0, END)
+        self._suggestion_list.insert(END, *suggestions)
+        self._suggestion_list.configure(height=len(suggestions))
+        self._suggestion_list.place(in_=self._site_entry, x=0, rely=1, relwidth=1)
+        self._suggestion_list.lift()
+
+    def __hide_suggestions(self):
+        if self._suggest_job:
+            self._root.after_cancel(self._suggest_job)
+            self._suggest_job = None
+        self._suggestion_list.place_forget()
+
+    def __focus_suggestions(self, event):
+        if self._suggestion_list.winfo_ismapped():
+            self._suggestion_list.focus_set()
+            self._suggestion_list.selection_clear(0, END)
+            self._suggestion_list.selection_set(0)
+            self._suggestion_list.activate(0)
+
+    def __pick_suggestion(self, event):
+        selection = self._suggestion_list.curselection()
+        if selection and event.keysym != 'Escape':
+            self._site_entry.delete(0, END)
+            self._site_entry.insert(0, self._suggestion_list.get(selection[0]))
+        self.__hide_suggestions()
+        self._site_entry.focus_set()
+        self._site_entry.icursor(END)
 
 
 if __name__ == '__main__':
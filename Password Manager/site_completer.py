@@ -0,0 +1,150 @@
+"""
+Site name autocomplete for MyPass.
+
+Prefix matches come from a sorted array searched with bisect. Typos are
+matched through a trigram index: a site within edit distance k of the query
+shares all but at most 3k of the query's trigrams, so only sites passing that
+count filter get a banded Levenshtein check.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Password%20Manager/site_completer.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+class SiteCompleter:
+    __slots__ = '_sorted', '_names', '_ids', '_grams'
+
+    # Completer configurations.
+    GRAM_SIZE = 3
+    PAD = '\0'
+    MIN_FUZZY_LENGTH = 3
+    MAX_POSTINGS = 10000
+    MAX_CANDIDATES = 500
+    BULK_SORT = 64
+
+    def __init__(self, sites=()) -> None:
+        self._names = []
+        self._ids = dict()
+        self._grams = dict()
+        for site in sites:
+            self.__index(site)
+        self._sorted = sorted(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _ngrams(self, text: str) -> set:
+        padded = self.PAD * (self.GRAM_SIZE - 1) + text.lower() + self.PAD * (self.GRAM_SIZE - 1)
+        return {padded[i:i + self.GRAM_SIZE] for i in range(len(padded) - self.GRAM_SIZE + 1)}
+
+    def __index(self, site: str) -> bool:
+        if site in self._ids:
+            return False
+        site_id = len(self._names)
+        self._ids[site] = site_id
+        self._names.append(site)
+        for gram in self._ngrams(site):
+            postings = self._grams.get(gram)
+            if postings is None:
+                postings = self._grams[gram] = array('I')
+            postings.append(site_id)
+        return True
+
+    def add(self, site: str) -> None:
+        if self.__index(site):
+            insort(self._sorted, site)
+
+    def update(self, sites) -> None:
+        added = [site for site in sites if self.__index(site)]
+        if len(added) > self.BULK_SORT:
+            # Timsort merges the two sorted runs in linear time, where insort moves the array per site.
+            added.sort()
+            self._sorted.extend(added)
+            self._sorted.sort()
+        else:
+            for site in added:
+                insort(self._sorted, site)
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        start = bisect_left(self._sorted, prefix)
+        matches = []
+        for site in self._sorted[start:start + limit]:
+            if not site.startswith(prefix):
+                break
+            matches.append(site)
+        return matches
+
+    @staticmethod
+    def distance(a: str, b: str, max_dist: int) -> int:
+        # Levenshtein distance within a diagonal band, giving up past max_dist.
+        if abs(len(a) - len(b)) > max_dist:
+            return max_dist + 1
+        over = max_dist + 1
+        previous = list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            lo = max(1, i - max_dist)
+            hi = min(len(b), i + max_dist)
+            current = [over] * (len(b) + 1)
+            current[0] = i if i <= max_dist else over
+            ca = a[i - 1]
+            for j in range(lo, hi + 1):
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]), over)
+            if min(current[lo - 1:hi + 1]) > max_dist:
+                return over
+            previous = current
+        return previous[-1]
+
+    def fuzzy(self, query: str, max_dist: int = None, limit: int = 10) -> list:
+        if len(query) < self.MIN_FUZZY_LENGTH:
+            return []
+        if max_dist is None:
+            max_dist = 1 if len(query) < 8 else 2
+
+        # Very common trigrams are left out of the count filter. When too few
+        # trigrams remain to filter on, the allowed edit distance is lowered.
+        postings = sorted((self._grams.get(gram, ()) for gram in self._ngrams(query)), key=len)
+        selected = [site_ids for site_ids in postings if len(site_ids) <= self.MAX_POSTINGS]
+        while max_dist and len(selected) <= self.GRAM_SIZE * max_dist:
+            max_dist -= 1
+        if not max_dist:
+            return []
+
+        counts = Counter()
+        for site_ids in selected:
+            counts.update(site_ids)
+
+        # Tighten the count filter until the candidates fit in the budget,
+        # then keep the candidates sharing the most trigrams.
+        required = len(selected) - self.GRAM_SIZE * max_dist
+        candidates = [(count, site_id) for site_id, count in counts.items() if count >= required]
+        while len(candidates) > self.MAX_CANDIDATES and max_dist > 1:
+            max_dist -= 1
+            required += self.GRAM_SIZE
+            candidates = [candidate for candidate in candidates if candidate[0] >= required]
+        if len(candidates) > self.MAX_CANDIDATES:
+            candidates.sort(reverse=True)
+            del candidates[self.MAX_CANDIDATES:]
+
+        lowered = query.lower()
+        scored = []
+        for _, site_id in candidates:
+            site = self._names[site_id]
+            dist = self.distance(lowered, site.lower(), max_dist)
+            if dist <= max_dist:
+                scored.append((dist, site))
+        scored.sort()
+        return [site for _, site in scored[:limit]]
+
+    def suggest(self, text: str, limit: int = 10) -> list:
+        suggestions = self.complete(text, limit)
+        if len(suggestions) < limit:
+            for site in self.fuzzy(text, limit=limit):
+                if site not in suggestions:
+                    suggestions.append(site)
+                    if len(suggestions) == limit:
+                        break
+        return suggestions
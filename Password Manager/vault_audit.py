@@ -0,0 +1,132 @@
+"""
+Vault health audit for MyPass.
+
+One streaming pass over the vault entries groups them by hashes instead of
+comparing every pair of passwords:
+
+- reused passwords share a keyed BLAKE2b digest of the password,
+- near-duplicates share the digest of a normalized form of the password,
+  lower cased, stripped of leading and trailing digits and symbols and
+  de-leeted, so 'Summer2023!', 'summer2024?' and 'Summ3r' land in the
+  same group,
+- weak entries are flagged on their own, for length, character classes
+  and, when a breach index is given, a match in the breach list.
+
+The digests are keyed with a random per-audit key, so the groups never
+hold a password in plain text.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Password%20Manager/vault_audit.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import hashlib
+import os
+import string
+import time
+
+from password_generator import CHAR_CLASSES, SYMBOLS
+
+MIN_LENGTH = 8
+MIN_CLASSES = 3
+MIN_NEAR_KEY = 4
+
+LEET = str.maketrans('0134578@$!|', 'oieastbasil')
+AFFIXES = string.digits + SYMBOLS + string.whitespace
+
+
+def _near_key(password: str) -> str:
+    # Counters and symbols around the word are dropped before de-leeting the rest.
+    return ''.join(filter(str.isalpha, password.casefold().strip(AFFIXES).translate(LEET)))
+
+
+def _group(table: dict, key, item) -> None:
+    # Most keys are unique, so a list is only made for the second item.
+    first = table.get(key)
+    if first is None:
+        table[key] = item
+    elif type(first) is list:
+        first.append(item)
+    else:
+        table[key] = [first, item]
+
+
+class AuditReport:
+    __slots__ = 'entries', 'reused', 'near_duplicates', 'weak', 'elapsed'
+
+    def __init__(self) -> None:
+        self.entries = 0
+        self.reused = []
+        self.near_duplicates = []
+        self.weak = []
+        self.elapsed = 0.0
+
+    @staticmethod
+    def _format_entry(entry) -> str:
+        site, index, username = entry
+        return f'{site} #{int(index) + 1} ({username})'
+
+    def format(self, limit: int = 20) -> str:
+        lines = [f'Audited {self.entries} entries in {self.elapsed:.2f}s.',
+                 f'{len(self.reused)} reused passwords, {len(self.near_duplicates)} near-duplicate groups, '
+                 f'{len(self.weak)} weak entries.']
+
+        sections = (
+            ('Reused passwords', self.reused),
+            ('Near-duplicate passwords', self.near_duplicates)
+        )
+        for title, groups in sections:
+            if groups:
+                lines.append(f'\n{title}:')
+            for group in groups[:limit]:
+                lines.append(f'  {len(group)} entries: ' + ', '.join(map(self._format_entry, group[:limit])))
+            if len(groups) > limit:
+                lines.append(f'  ... {len(groups) - limit} more groups.')
+
+        if self.weak:
+            lines.append('\nWeak entries:')
+        for entry, reasons in self.weak[:limit]:
+            lines.append(f'  {self._format_entry(entry)}: {", ".join(reasons)}')
+        if len(self.weak) > limit:
+            lines.append(f'  ... {len(self.weak) - limit} more entries.')
+        return '\n'.join(lines)
+
+
+def audit(entries, breaches=None) -> AuditReport:
+    # Audits (site, index, username, password) tuples, as VaultStorage.entries yields them.
+    start = time.perf_counter()
+    key = os.urandom(32)
+    classes = [frozenset(chars) for chars in CHAR_CLASSES.values()]
+    report = AuditReport()
+    exact = dict()
+    near = dict()
+
+    for site, index, username, password in entries:
+        report.entries += 1
+        entry = site, index, username
+        digest = hashlib.blake2b(password.encode('utf-8'), key=key, digest_size=16).digest()
+        _group(exact, digest, entry)
+
+        near_key = _near_key(password)
+        if len(near_key) >= MIN_NEAR_KEY:
+            near_digest = hashlib.blake2b(near_key.encode('utf-8'), key=key, digest_size=16).digest()
+            _group(near, near_digest, (digest, entry))
+
+        reasons = []
+        if len(password) < MIN_LENGTH:
+            reasons.append(f'shorter than {MIN_LENGTH}')
+        used = sum(not char_class.isdisjoint(password) for char_class in classes)
+        if used < MIN_CLASSES:
+            reasons.append(f'{used} character classes')
+        if breaches is not None and breaches.is_breached(password):
+            reasons.append('breached')
+        if reasons:
+            report.weak.append((entry, reasons))
+
+    report.reused = sorted((group for group in exact.values() if type(group) is list), key=len, reverse=True)
+    for group in near.values():
+        # Groups of one repeated password are reported as reuse already.
+        if type(group) is list and len({digest for digest, entry in group}) > 1:
+            report.near_duplicates.append([entry for digest, entry in group])
+    report.near_duplicates.sort(key=len, reverse=True)
+    report.elapsed = time.perf_counter() - start
+    return report
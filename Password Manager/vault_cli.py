@@ -0,0 +1,505 @@
+"""
+Headless command line tools for the MyPass vault.
+
+Import and export stream their rows, so only one batch is held in memory
+at a time. Imported rows go through the same per-site index scheme as the
+GUI: a row for an existing site is stored under the site's next index.
+A log vault is imported into through a VaultLogAppender, which keeps the
+entry count of every site but none of the passwords; with
+--on-collision skip it keeps every site's usernames too. Like the GUI,
+the vault commands use vault.key when it exists; without a key file,
+export, convert and audit refuse encrypted passwords rather than pass
+tokens on.
+
+Usage:
+    python vault_cli.py import dump.csv --vault data.db
+    python vault_cli.py export backup.jsonl
+    python vault_cli.py convert data.json data.db
+    python vault_cli.py convert data.log encrypted.log --target-key vault.key
+    python vault_cli.py compact data.log
+    python vault_cli.py generate -n 1000000 -l 16 --require lower,upper,digits
+    python vault_cli.py breach-build pwned-passwords-sha1-ordered-by-hash.txt --presorted
+    python vault_cli.py breach-check
+    python vault_cli.py audit
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Password%20Manager/vault_cli.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import argparse
+import csv
+import getpass
+import json
+import os
+import sys
+import time
+
+import breach_check
+import vault_audit
+from password_generator import CHAR_CLASSES, PasswordGenerator
+from vault_crypto import TOKEN_PREFIX, EncryptedStorage, KeySession
+from vault_storage import BACKENDS, VaultLog, VaultLogAppender, backend_for, convert, open_storage
+
+DEFAULT_VAULT = 'data.log'
+DEFAULT_KEY = 'vault.key'
+DEFAULT_BREACH_FILE = 'breached.bin'
+FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl'
+}
+PASSPHRASE_ENV = 'MYPASS_PASSPHRASE'
+PROGRESS_INTERVAL = 1.0
+GENERATE_CHUNK = 100000
+PROGRESS_CHUNK = 10000
+
+
+class _Progress:
+    __slots__ = '_label', '_unit', '_quiet', '_start', '_last', 'count'
+
+    def __init__(self, label: str, quiet: bool, unit: str = 'rows') -> None:
+        self._label = label
+        self._unit = unit
+        self._quiet = quiet
+        self._start = self._last = time.perf_counter()
+        self.count = 0
+
+    def update(self, count: int) -> None:
+        self.count += count
+        now = time.perf_counter()
+        if not self._quiet and now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            print(f'\r{self._label} {self.count} {self._unit}, '
+                  f'{self.count / (now - self._start):.0f} {self._unit}/s',
+                  end='', file=sys.stderr)
+
+    def done(self, suffix: str = '') -> None:
+        elapsed = time.perf_counter() - self._start
+        rate = self.count / elapsed if elapsed else 0.0
+        print(f'\r{self._label} {self.count} {self._unit} in {elapsed:.2f}s '
+              f'({rate:.0f} {self._unit}/s){suffix}.',
+              file=sys.stderr)
+
+
+def _open_vault(path: str, backend: str, key_file: str, create: bool = False, opener=open_storage):
+    # Opens the vault with opener(path, backend), wrapped for encryption when a key file is given.
+    if not key_file:
+        return opener(path, backend)
+
+    session = KeySession(key_file)
+    if not session.exists() and not create:
+        raise ValueError(f'{key_file!r} file not found.')
+
+    passphrase = os.environ.get(PASSPHRASE_ENV) or getpass.getpass(f'Master password for {key_file}: ')
+    if session.exists():
+        if not session.unlock(passphrase):
+            raise ValueError(f'Wrong master password for {key_file!r}.')
+    else:
+        if PASSPHRASE_ENV not in os.environ and getpass.getpass('Repeat master password: ') != passphrase:
+            raise ValueError('Master passwords do not match.')
+        session.create(passphrase)
+
+    return EncryptedStorage(opener(path, backend), session)
+
+
+def _int_at_least(minimum: int):
+    # argparse type for an integer no smaller than minimum.
+    def parse(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f'must be at least {minimum}, got {number}')
+        return number
+    parse.__name__ = 'integer'
+    return parse
+
+
+def _plain_entries(vault, path: str, flag: str = '--key'):
+    # Entries of a vault opened without a key, refusing the encrypted ones instead of passing tokens on.
+    for entry in vault.entries():
+        if entry[3].startswith(TOKEN_PREFIX):
+            raise ValueError(f'{path!r} holds encrypted passwords, give its key file with {flag}.')
+        yield entry
+
+
+def _format_for(path: str, fmt: str) -> str:
+    if fmt:
+        return fmt
+    if path == '-':
+        return 'csv'
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        return FORMATS[extension]
+    except KeyError:
+        raise ValueError(f'Unknown dump file type {extension!r}, use --format.') from None
+
+
+def _open_text(path: str, mode: str):
+    # Reading skips a leading BOM, which CSV exports of other password managers often start with.
+    encoding = 'utf-8-sig' if mode == 'r' else 'utf-8'
+    if path == '-':
+        stream = sys.stdin if mode == 'r' else sys.stdout
+        return open(stream.fileno(), mode, newline='', encoding=encoding, closefd=False)
+    return open(path, mode, newline='', encoding=encoding)
+
+
+def _read_rows(args):
+    columns = args.site_column, args.username_column, args.password_column
+
+    with _open_text(args.input, 'r') as f:
+        if _format_for(args.input, args.format) == 'csv':
+            reader = csv.reader(f)
+            header = {name.strip().lower(): i for i, name in enumerate(next(reader, ()))}
+            missing = [column for column in columns if column.lower() not in header]
+            if missing:
+                raise ValueError(f'Missing column(s) {", ".join(missing)} in {args.input!r}.')
+
+            positions = [header[column.lower()] for column in columns]
+            width = max(positions) + 1
+            for row in reader:
+                if len(row) >= width:
+                    yield tuple(row[i].strip() for i in positions)
+                else:
+                    yield None
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    yield tuple(str(record.get(column) or '').strip() for column in columns)
+                else:
+                    yield None
+
+
+def _drop_collisions(vault, batch: list) -> list:
+    # Keep only rows whose username is not stored for the site yet.
+    known = dict()
+    rows = []
+    for site, username, password in batch:
+        usernames = known.get(site)
+        if usernames is None:
+            usernames = known[site] = vault.usernames(site)
+
+        if username not in usernames:
+            usernames.add(username)
+            rows.append((site, username, password))
+    return rows
+
+
+def _import(args) -> None:
+    if args.input != '-' and not os.path.exists(args.input):
+        raise ValueError(f'{args.input!r} file not found.')
+
+    def opener(path, backend):
+        # A log vault is appended to without loading its entries.
+        if (backend or backend_for(path)) == 'log':
+            return VaultLogAppender(path, usernames=args.on_collision == 'skip')
+        return open_storage(path, backend)
+
+    vault = _open_vault(args.vault, args.backend, args.key, create=True, opener=opener)
+    progress = _Progress('Imported', args.quiet)
+    invalid = skipped = 0
+
+    def flush(batch):
+        nonlocal skipped
+        rows = _drop_collisions(vault, batch) if args.on_collision == 'skip' else batch
+        if rows:
+            vault.add_many(rows)
+        skipped += len(batch) - len(rows)
+        progress.update(len(rows))
+
+    try:
+        batch = []
+        for row in _read_rows(args):
+            if row is None or not all(row):
+                invalid += 1
+                continue
+            batch.append(row)
+            if len(batch) >= args.batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        vault.close()
+
+    progress.done(f', {skipped} skipped, {invalid} invalid')
+
+
+def _export(args) -> None:
+    if not os.path.exists(args.vault):
+        raise ValueError(f'{args.vault!r} file not found.')
+
+    fmt = _format_for(args.output, args.format)
+    vault = _open_vault(args.vault, args.backend, args.key)
+    entries = vault.entries() if args.key else _plain_entries(vault, args.vault)
+    progress = _Progress('Exported', args.quiet)
+
+    try:
+        with _open_text(args.output, 'w') as f:
+            if fmt == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(('site', 'index', 'username', 'password'))
+                write = writer.writerow
+            else:
+                def write(entry):
+                    site, index, username, password = entry
+                    f.write(json.dumps({'site': site, 'index': index,
+                                        'username': username, 'password': password}) + '\n')
+
+            for entry in entries:
+                write(entry)
+                progress.update(1)
+    except ValueError:
+        # Do not leave a partial dump behind.
+        if args.output != '-' and os.path.exists(args.output):
+            os.remove(args.output)
+        raise
+    finally:
+        vault.close()
+
+    progress.done()
+
+
+def _convert(args) -> None:
+    if not os.path.exists(args.source):
+        raise ValueError(f'{args.source!r} file not found.')
+    source = _open_vault(args.source, args.source_backend, args.source_key)
+    try:
+        target = _open_vault(args.target, args.target_backend, args.target_key, create=True)
+    except BaseException:
+        source.close()
+        raise
+    try:
+        start = time.perf_counter()
+        entries = source.entries() if args.source_key else _plain_entries(source, args.source, '--source-key')
+        count = convert(entries, target, args.batch_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        source.close()
+        target.close()
+    print(f'Converted {count} entries in {elapsed:.2f}s.', file=sys.stderr)
+
+
+def _compact(args) -> None:
+    if not os.path.exists(args.vault):
+        raise ValueError(f'{args.vault!r} file not found.')
+    if backend_for(args.vault) != 'log':
+        raise ValueError(f'Only log vaults are compacted, {args.vault!r} is not one.')
+
+    size = os.path.getsize(args.vault)
+    vault = VaultLog(args.vault)
+    try:
+        dropped = vault.compact()
+    except OSError as e:
+        raise ValueError(f'{args.vault!r} was not compacted: {e}') from None
+    finally:
+        vault.close()
+    print(f'Dropped {dropped} unreadable records, {size} -> {os.path.getsize(args.vault)} bytes.', file=sys.stderr)
+
+
+def _generate(args) -> None:
+    unknown = set(args.require) - set(CHAR_CLASSES)
+    if unknown:
+        raise ValueError(f'Unknown character class(es) {", ".join(sorted(unknown))}, '
+                         f'expected some of {", ".join(CHAR_CLASSES)}.')
+
+    generator = PasswordGenerator(args.chars, required=[CHAR_CLASSES[name] for name in args.require])
+    progress = _Progress('Generated', args.quiet, 'passwords')
+
+    with _open_text(args.output, 'w') as f:
+        remaining = args.count
+        while remaining:
+            chunk = generator.generate_many(args.length, min(remaining, GENERATE_CHUNK))
+            f.write('\n'.join(chunk))
+            f.write('\n')
+            remaining -= len(chunk)
+            progress.update(len(chunk))
+
+    progress.done()
+
+
+def _breach_build(args) -> None:
+    if args.input != '-' and not os.path.exists(args.input):
+        raise ValueError(f'{args.input!r} file not found.')
+    if args.bloom_fp is not None and not 0 < args.bloom_fp < 1:
+        raise ValueError('--bloom-fp must be between 0 and 1.')
+
+    progress = _Progress('Indexed', args.quiet, 'hashes')
+
+    def lines(f):
+        for i, line in enumerate(f, 1):
+            yield line
+            if not i % PROGRESS_CHUNK:
+                progress.update(PROGRESS_CHUNK)
+
+    with (_open_text(args.input, 'r') if args.input == '-' else open(args.input, encoding='ascii')) as f:
+        stats = breach_check.build(lines(f), args.output, presorted=args.presorted,
+                                   bloom_fp=args.bloom_fp, run_records=args.run_records)
+
+    progress.count = stats['records']
+    progress.done(f', {stats["duplicates"]} duplicates, {stats["invalid"]} invalid')
+
+
+def _breach_check(args) -> None:
+    if not os.path.exists(args.breach_file):
+        raise ValueError(f'{args.breach_file!r} file not found.')
+
+    index = breach_check.BreachIndex(args.breach_file)
+    try:
+        password = getpass.getpass('Password to check: ')
+        start = time.perf_counter()
+        breached = index.is_breached(password)
+        elapsed = time.perf_counter() - start
+    finally:
+        index.close()
+
+    print('Breached, do not use this password.' if breached else 'Not found in the breach list.')
+    print(f'Checked {len(index)} hashes in {elapsed * 1e6:.0f}us.', file=sys.stderr)
+    if breached:
+        sys.exit(1)
+
+
+def _audit(args) -> None:
+    if not os.path.exists(args.vault):
+        raise ValueError(f'{args.vault!r} file not found.')
+
+    vault = _open_vault(args.vault, args.backend, args.key)
+    breaches = breach_check.BreachIndex(args.breach_file) if os.path.exists(args.breach_file) else None
+    progress = _Progress('Audited', args.quiet, 'entries')
+
+    def entries():
+        for i, entry in enumerate(vault.entries() if args.key else _plain_entries(vault, args.vault), 1):
+            yield entry
+            if not i % PROGRESS_CHUNK:
+                progress.update(PROGRESS_CHUNK)
+
+    try:
+        report = vault_audit.audit(entries(), breaches)
+    finally:
+        vault.close()
+        if breaches:
+            breaches.close()
+
+    progress.count = report.entries
+    progress.done()
+    print(report.format(args.limit))
+
+
+def _add_vault_arguments(parser) -> None:
+    parser.add_argument('--vault', default=DEFAULT_VAULT, help='vault file (default: %(default)s)')
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help='vault backend, guessed from the file extension by default')
+    parser.add_argument('--format', choices=sorted(set(FORMATS.values())),
+                        help='dump format, guessed from the file extension by default')
+    _add_key_argument(parser)
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+
+
+def _add_key_argument(parser, flag: str = '--key') -> None:
+    # The GUI's key file is used when present, so its encrypted vault is never opened raw.
+    parser.add_argument(flag, default=DEFAULT_KEY if os.path.exists(DEFAULT_KEY) else None,
+                        help=f'key file of an encrypted vault, the master password is read from '
+                             f'${PASSPHRASE_ENV} or prompted for (default: {DEFAULT_KEY} when it exists)')
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='MyPass vault tools.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='append the rows of a CSV/JSONL dump to the vault')
+    import_parser.add_argument('input', help="dump to read, '-' for stdin")
+    _add_vault_arguments(import_parser)
+    import_parser.add_argument('--site-column', default='site', help='site column (default: %(default)s)')
+    import_parser.add_argument('--username-column', default='username',
+                               help='username column (default: %(default)s)')
+    import_parser.add_argument('--password-column', default='password',
+                               help='password column (default: %(default)s)')
+    import_parser.add_argument('--on-collision', choices=('append', 'skip'), default='append',
+                               help="'append' stores a row for an existing site under the next index, "
+                                    "'skip' drops rows whose username the site already has "
+                                    "(default: %(default)s)")
+    import_parser.add_argument('--batch-size', type=_int_at_least(1), default=5000,
+                               help='rows written per batch (default: %(default)s)')
+    import_parser.set_defaults(func=_import)
+
+    export_parser = commands.add_parser('export', help='write every vault entry to a CSV/JSONL dump')
+    export_parser.add_argument('output', help="dump to write, '-' for stdout")
+    _add_vault_arguments(export_parser)
+    export_parser.set_defaults(func=_export)
+
+    convert_parser = commands.add_parser('convert', help='copy every entry of one vault into another')
+    convert_parser.add_argument('source', help='vault to read')
+    convert_parser.add_argument('target', help='vault to append to')
+    convert_parser.add_argument('--source-backend', choices=BACKENDS,
+                                help='source backend, guessed from the file extension by default')
+    convert_parser.add_argument('--target-backend', choices=BACKENDS,
+                                help='target backend, guessed from the file extension by default')
+    _add_key_argument(convert_parser, '--source-key')
+    convert_parser.add_argument('--target-key', help='key file to encrypt the target vault with, '
+                                                     'created when missing')
+    convert_parser.add_argument('--batch-size', type=int, default=1000,
+                                help='entries written per transaction (default: %(default)s)')
+    convert_parser.set_defaults(func=_convert)
+
+    compact_parser = commands.add_parser('compact', help='rewrite a log vault without its unreadable records')
+    compact_parser.add_argument('vault', nargs='?', default=DEFAULT_VAULT, help='log vault (default: %(default)s)')
+    compact_parser.set_defaults(func=_compact)
+
+    generate_parser = commands.add_parser('generate', help='write random passwords, one per line')
+    generate_parser.add_argument('-n', '--count', type=_int_at_least(0), default=1,
+                                 help='passwords to generate (default: 1)')
+    generate_parser.add_argument('-l', '--length', type=_int_at_least(1), default=16,
+                                 help='password length (default: 16)')
+    generate_parser.add_argument('--chars', default=''.join(CHAR_CLASSES.values()),
+                                 help='password alphabet (default: letters, digits and symbols)')
+    generate_parser.add_argument('--require', type=lambda value: [name for name in value.split(',') if name],
+                                 default=[], help=f'comma separated classes every password must contain, '
+                                                  f'some of {", ".join(CHAR_CLASSES)}')
+    generate_parser.add_argument('-o', '--output', default='-', help="file to write, '-' for stdout (default)")
+    generate_parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+    generate_parser.set_defaults(func=_generate)
+
+    breach_build_parser = commands.add_parser('breach-build',
+                                              help='build the breach hash file from a SHA-1 hash list')
+    breach_build_parser.add_argument('input', help="'HASH[:count]' lines, as the HIBP downloads, '-' for stdin")
+    breach_build_parser.add_argument('-o', '--output', default=DEFAULT_BREACH_FILE,
+                                     help='hash file to write (default: %(default)s)')
+    breach_build_parser.add_argument('--presorted', action='store_true',
+                                     help='input is already ordered by hash, skips the external sort')
+    breach_build_parser.add_argument('--bloom-fp', type=float,
+                                     help='also build a Bloom filter with this false positive rate, e.g. 0.01')
+    breach_build_parser.add_argument('--run-records', type=int, default=10_000_000,
+                                     help='hashes sorted in memory per run (default: %(default)s)')
+    breach_build_parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+    breach_build_parser.set_defaults(func=_breach_build)
+
+    breach_check_parser = commands.add_parser('breach-check', help='check a password against the breach hash file')
+    breach_check_parser.add_argument('--breach-file', default=DEFAULT_BREACH_FILE,
+                                     help='hash file to search (default: %(default)s)')
+    breach_check_parser.set_defaults(func=_breach_check)
+
+    audit_parser = commands.add_parser('audit', help='report reused, near-duplicate and weak passwords')
+    audit_parser.add_argument('--vault', default=DEFAULT_VAULT, help='vault file (default: %(default)s)')
+    audit_parser.add_argument('--backend', choices=BACKENDS,
+                              help='vault backend, guessed from the file extension by default')
+    _add_key_argument(audit_parser)
+    audit_parser.add_argument('--breach-file', default=DEFAULT_BREACH_FILE,
+                              help='also flag breached passwords, when this hash file exists (default: %(default)s)')
+    audit_parser.add_argument('--limit', type=int, default=20,
+                              help='groups and entries listed per section (default: %(default)s)')
+    audit_parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+    audit_parser.set_defaults(func=_audit)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    main()
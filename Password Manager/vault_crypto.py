@@ -0,0 +1,259 @@
+"""
+Password encryption for the MyPass vault.
+
+The master key is derived once per unlock with scrypt (PBKDF2-HMAC-SHA256
+when the interpreter lacks scrypt). The KDF cost is calibrated when the
+key file is created, so unlocking takes about the requested time on that
+machine. The key then lives in a KeySession until it has been idle for
+the session timeout.
+
+Each password is encrypted on its own, so a search decrypts only the
+entries of one site and an add encrypts only the new entry. Records use
+encrypt-then-MAC built from keyed BLAKE2b, all from hashlib: a counter mode
+keystream for the ciphertext and a tag over the site, the username, the
+nonce and the ciphertext. A record therefore cannot be modified or moved
+to another entry without being detected. Sites and usernames stay in
+clear text, so the site and username indexes keep working.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Password%20Manager/vault_crypto.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+
+from vault_storage import VaultStorage
+
+TOKEN_PREFIX = 'enc1:'
+CHECK_TEXT = 'MyPass'
+
+
+class VaultLocked(Exception):
+    pass
+
+
+class DecryptionError(ValueError):
+    pass
+
+
+class RecordCipher:
+    __slots__ = '_enc_key', '_mac_key'
+
+    NONCE_SIZE = 16
+    TAG_SIZE = 32
+    BLOCK_SIZE = 64
+
+    def __init__(self, key: bytes) -> None:
+        self._enc_key = hashlib.blake2b(key, digest_size=64, person=b'mypass-enc').digest()
+        self._mac_key = hashlib.blake2b(key, digest_size=64, person=b'mypass-mac').digest()
+
+    def _keystream(self, nonce: bytes, size: int) -> bytes:
+        blocks = []
+        for counter in range((size + self.BLOCK_SIZE - 1) // self.BLOCK_SIZE):
+            blocks.append(hashlib.blake2b(nonce + counter.to_bytes(8, 'big'),
+                                          key=self._enc_key, digest_size=self.BLOCK_SIZE).digest())
+        return b''.join(blocks)[:size]
+
+    @staticmethod
+    def _xor(data: bytes, keystream: bytes) -> bytes:
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(len(data), 'big')
+
+    def _tag(self, aad: bytes, nonce: bytes, ciphertext: bytes) -> bytes:
+        mac = hashlib.blake2b(key=self._mac_key, digest_size=self.TAG_SIZE)
+        mac.update(len(aad).to_bytes(8, 'big'))
+        mac.update(aad)
+        mac.update(nonce)
+        mac.update(ciphertext)
+        return mac.digest()
+
+    def encrypt(self, plaintext: str, aad: str = '') -> str:
+        data = plaintext.encode('utf-8')
+        nonce = os.urandom(self.NONCE_SIZE)
+        ciphertext = self._xor(data, self._keystream(nonce, len(data)))
+        tag = self._tag(aad.encode('utf-8'), nonce, ciphertext)
+        return TOKEN_PREFIX + base64.urlsafe_b64encode(nonce + ciphertext + tag).decode('ascii')
+
+    def decrypt(self, token: str, aad: str = '') -> str:
+        try:
+            blob = base64.urlsafe_b64decode(token[len(TOKEN_PREFIX):])
+        except ValueError:
+            raise DecryptionError('Malformed encrypted record.') from None
+        if not token.startswith(TOKEN_PREFIX) or len(blob) < self.NONCE_SIZE + self.TAG_SIZE:
+            raise DecryptionError('Malformed encrypted record.')
+
+        nonce = blob[:self.NONCE_SIZE]
+        ciphertext = blob[self.NONCE_SIZE:-self.TAG_SIZE]
+        tag = blob[-self.TAG_SIZE:]
+        if not hmac.compare_digest(tag, self._tag(aad.encode('utf-8'), nonce, ciphertext)):
+            raise DecryptionError('Encrypted record failed authentication.')
+        return self._xor(ciphertext, self._keystream(nonce, len(ciphertext))).decode('utf-8')
+
+
+def derive_key(passphrase: str, params: dict) -> bytes:
+    salt = base64.b64decode(params['salt'])
+    if params['kdf'] == 'scrypt':
+        n, r, p = params['n'], params['r'], params['p']
+        return hashlib.scrypt(passphrase.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * r * n + 1024 * 1024, dklen=32)
+    return hashlib.pbkdf2_hmac('sha256', passphrase.encode('utf-8'), salt, params['iterations'], dklen=32)
+
+
+def calibrate(target_seconds: float) -> dict:
+    # Double the KDF cost until one derivation takes about target_seconds.
+    params = {'salt': base64.b64encode(os.urandom(16)).decode('ascii')}
+    if hasattr(hashlib, 'scrypt'):
+        params.update(kdf='scrypt', n=2 ** 12, r=8, p=1)
+        cost, limit = 'n', 2 ** 20
+    else:
+        params.update(kdf='pbkdf2', iterations=50000)
+        cost, limit = 'iterations', 2 ** 26
+
+    while params[cost] < limit:
+        start = time.perf_counter()
+        derive_key('calibration', params)
+        if time.perf_counter() - start >= target_seconds / 2:
+            break
+        params[cost] *= 2
+    return params
+
+
+class KeySession:
+
+    def __init__(self, key_file: str, idle_timeout: float = 300) -> None:
+        self.key_file = key_file
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._cipher = None
+        self._last_used = 0.0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.key_file)
+
+    def create(self, passphrase: str, target_seconds: float = 0.5) -> None:
+        params = calibrate(target_seconds)
+        cipher = RecordCipher(derive_key(passphrase, params))
+        key_data = {
+            'version': 1,
+            'kdf': params,
+            'check': cipher.encrypt(CHECK_TEXT)
+        }
+
+        tmp_path = self.key_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(key_data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.key_file)
+        self.__start(cipher)
+
+    def unlock(self, passphrase: str) -> bool:
+        with open(self.key_file) as f:
+            key_data = json.load(f)
+
+        cipher = RecordCipher(derive_key(passphrase, key_data['kdf']))
+        try:
+            if cipher.decrypt(key_data['check']) != CHECK_TEXT:
+                return False
+        except DecryptionError:
+            return False
+        self.__start(cipher)
+        return True
+
+    def __start(self, cipher: RecordCipher) -> None:
+        with self._lock:
+            self._cipher = cipher
+            self._last_used = time.monotonic()
+
+    def lock(self) -> None:
+        with self._lock:
+            self._cipher = None
+
+    def __expire(self) -> None:
+        if self._cipher and time.monotonic() - self._last_used > self.idle_timeout:
+            self._cipher = None
+
+    def check_idle(self) -> bool:
+        # Drops the key once the session has been idle too long, returns True while unlocked.
+        with self._lock:
+            self.__expire()
+            return self._cipher is not None
+
+    @property
+    def cipher(self) -> RecordCipher:
+        with self._lock:
+            self.__expire()
+            if self._cipher is None:
+                raise VaultLocked('The vault is locked.')
+            self._last_used = time.monotonic()
+            return self._cipher
+
+
+class EncryptedStorage(VaultStorage):
+
+    def __init__(self, storage: VaultStorage, session: KeySession) -> None:
+        super().__init__(storage.path)
+        self.stats = storage.stats
+        self._storage = storage
+        self._session = session
+
+    @staticmethod
+    def _aad(site: str, username: str) -> str:
+        return site + '\0' + username
+
+    def _decrypt(self, cipher: RecordCipher, site: str, username: str, password: str) -> str:
+        # Entries saved before encryption was enabled stay plain text until encrypt_plaintext runs.
+        if password.startswith(TOKEN_PREFIX):
+            return cipher.decrypt(password, self._aad(site, username))
+        return password
+
+    def add_many(self, rows):
+        cipher = self._session.cipher
+        return self._storage.add_many([(site, username, cipher.encrypt(password, self._aad(site, username)))
+                                       for site, username, password in rows])
+
+    def _lookup(self, site):
+        entries = self._storage._lookup(site)
+        cipher = self._session.cipher
+        return {index: {'Username': entry['Username'],
+                        'Password': self._decrypt(cipher, site, entry['Username'], entry['Password'])}
+                for index, entry in entries.items()}
+
+    def sites(self):
+        return self._storage.sites()
+
+    def sites_since(self, position):
+        return self._storage.sites_since(position)
+
+    def sites_for_username(self, username):
+        return self._storage.sites_for_username(username)
+
+    def usernames(self, site):
+        # Usernames are stored in the clear, nothing to decrypt.
+        return self._storage.usernames(site)
+
+    def entries(self):
+        cipher = self._session.cipher
+        for site, index, username, password in self._storage.entries():
+            yield site, index, username, self._decrypt(cipher, site, username, password)
+
+    def encrypt_plaintext(self):
+        # Encrypts the entries saved before encryption was enabled, returns how many.
+        cipher = self._session.cipher
+
+        def encrypt(site, username, password):
+            if password.startswith(TOKEN_PREFIX):
+                return password
+            return cipher.encrypt(password, self._aad(site, username))
+
+        return self._storage.rewrite_passwords(encrypt)
+
+    def refresh(self):
+        self._storage.refresh()
+
+    def close(self):
+        self._storage.close()
@@ -0,0 +1,783 @@
+"""
+Storage backends used by MyPass.
+
+Every backend implements VaultStorage and keeps the per-site integer index
+scheme of the original data.json: the n-th credential saved for a site gets
+index n - 1.
+
+- 'log': append-only JSON lines log (the default). Adding an entry costs one
+  small write no matter how big the vault is. Records are never replaced, a
+  record landing on a taken index moves to the site's next free one, so
+  the log only holds dead records when a line cannot be read. Those are
+  dropped on demand by compact() ("vault_cli.py compact"), which swaps the
+  rewritten log in with an atomic rename. The whole vault stays resident
+  as an index keyed by site and by username. The log file is only read again when its inode, size
+  or mtime changes: records appended by another writer are applied as deltas,
+  anything else triggers a full reload. Writers in other processes are kept
+  apart by an OS lock on a side file, taken around catching up and
+  appending, so two writers never pick the same index for a site.
+- 'json': the original nested {site: {index: {...}}} file, rewritten whole on
+  every add.
+- 'sqlite': a WAL mode database on one long-lived connection, with indexed
+  site and username lookups and one transaction per batch of adds.
+
+VaultWriter moves saving off the caller's thread. Entries queued while a
+write is in flight are coalesced into the next add_many call, so a burst of
+adds costs one fsync'd write.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Password%20Manager/vault_storage.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+def _fsync_dir(path):
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _stat_key(st):
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class _FileLock:
+    # Exclusive lock between processes, on a side file that compaction never replaces.
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+
+    def __enter__(self):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        self._file.close()
+
+
+class VaultStorage:
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = {'hits': 0, 'misses': 0, 'reloads': 0, 'deltas': 0}
+
+    def _lookup(self, site):
+        raise NotImplementedError
+
+    def add(self, site, username, password):
+        return self.add_many([(site, username, password)])[0]
+
+    def add_many(self, rows):
+        raise NotImplementedError
+
+    def get(self, site):
+        try:
+            entries = self._lookup(site)
+        except KeyError:
+            self.stats['misses'] += 1
+            raise
+        self.stats['hits'] += 1
+        return entries
+
+    def sites(self):
+        raise NotImplementedError
+
+    def sites_since(self, position):
+        # Sites added after position and the position to pass next time, for
+        # backends listing their sites in the order they were added.
+        sites = self.sites()
+        return sites[position:], len(sites)
+
+    def sites_for_username(self, username):
+        raise NotImplementedError
+
+    def usernames(self, site):
+        # Set of the usernames stored for a site, empty for an unknown site.
+        try:
+            return {entry['Username'] for entry in self._lookup(site).values()}
+        except KeyError:
+            return set()
+
+    def entries(self):
+        # Yields (site, index, username, password) tuples.
+        raise NotImplementedError
+
+    def rewrite_passwords(self, transform):
+        # Replaces every password with transform(site, username, password) in
+        # one atomic write, returns how many changed.
+        raise NotImplementedError
+
+    def refresh(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class VaultLog(VaultStorage):
+
+    TMP_SUFFIX = '.tmp'
+    LOCK_SUFFIX = '.lock'
+
+    def __init__(self, path):
+        super().__init__(path)
+
+        self._lock = threading.RLock()
+        self._data = dict()
+        self._usernames = dict()
+        self._site_order = []
+        self._records = 0
+        self._live = 0
+        self._size = 0
+        self._stat = None
+
+        # Under the lock, so a record another writer is appending is not mistaken for a torn one.
+        self._flock = _FileLock(self.path + self.LOCK_SUFFIX)
+        with self._flock:
+            if self._load() != self._size:
+                # Torn write at the tail, left behind by a crash.
+                os.truncate(self.path, self._size)
+                self._stat = None
+            self._file = open(self.path, 'ab')
+            self._update_stat()
+
+    @staticmethod
+    def _encode(record):
+        return (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def _apply(self, record):
+        site = record['site']
+        username = record['Username']
+        password = record['Password']
+        entries = self._data.get(site)
+        if entries is None:
+            entries = self._data[site] = dict()
+            self._site_order.append(site)
+
+        # Entries are never replaced, a record whose index is taken moves to the next free one.
+        index = record['index']
+        while str(index) in entries:
+            index += 1
+
+        entries[str(index)] = {
+            'Username': username,
+            'Password': password
+        }
+        self._live += 1
+        user_sites = self._usernames.setdefault(username, dict())
+        user_sites[site] = user_sites.get(site, 0) + 1
+
+    def _load(self, offset=0):
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return 0
+
+        with f:
+            f.seek(offset)
+            good_offset = offset
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    pass
+                self._records += 1
+                good_offset += len(line)
+            st = os.fstat(f.fileno())
+
+        self._size = good_offset
+        self._stat = _stat_key(st)
+        return st.st_size
+
+    def _update_stat(self):
+        self._stat = _stat_key(os.fstat(self._file.fileno()))
+
+    def refresh(self):
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return
+
+            if _stat_key(st) == self._stat:
+                return
+
+            if self._stat and st.st_ino == self._stat[0] and st.st_size >= self._size:
+                # Same file grown by another writer, apply the new records only.
+                self._load(self._size)
+                self.stats['deltas'] += 1
+            else:
+                # Replaced or rewritten file, rebuild the index from scratch.
+                # Sites are never removed, so the known ones keep their place in the site order.
+                known, site_order = self._data, self._site_order
+                self._data = dict()
+                self._usernames = dict()
+                self._site_order = []
+                self._records = self._live = self._size = 0
+                self._load()
+                site_order.extend(site for site in self._site_order if site not in known)
+                self._site_order = site_order
+                self._file.close()
+                self._file = open(self.path, 'ab')
+                self.stats['reloads'] += 1
+
+    def _append(self, chunk, count):
+        try:
+            self._file.write(chunk)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError:
+            # Drop the partial record, so the log never holds a torn line in the middle.
+            self._file.truncate(self._size)
+            raise
+        self._size += len(chunk)
+        self._records += count
+        self._update_stat()
+
+    def compact(self):
+        # Rewrites the log without its unreadable records, returns how many were
+        # dropped. Both locks are held throughout, so no record is appended meanwhile.
+        with self._lock, self._flock:
+            self.refresh()
+            dropped = self._records - self._live
+            if dropped:
+                self._rewrite(dict())
+        return dropped
+
+    def add_many(self, rows):
+        with self._lock, self._flock:
+            self.refresh()
+
+            records = []
+            next_index = dict()
+            for site, username, password in rows:
+                index = next_index[site] if site in next_index else self._next_index(site)
+                next_index[site] = index + 1
+                records.append({'site': site, 'index': index, 'Username': username, 'Password': password})
+
+            self._append(b''.join(self._encode(record) for record in records), len(records))
+            for record in records:
+                self._apply(record)
+
+        return [record['index'] for record in records]
+
+    def rewrite_passwords(self, transform):
+        with self._lock, self._flock:
+            self.refresh()
+            changes = dict()
+            for site, entries in self._data.items():
+                for index, entry in entries.items():
+                    password = transform(site, entry['Username'], entry['Password'])
+                    if password != entry['Password']:
+                        changes[site, index] = password
+            if changes:
+                self._rewrite(changes)
+        return len(changes)
+
+    def _rewrite(self, changes):
+        # Writes the resident entries, with the {(site, index): password} changes, to
+        # a new log and renames it over this one. The caller holds both locks.
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + '.', suffix=self.TMP_SUFFIX,
+                                        dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for site, entries in self._data.items():
+                    for index, entry in entries.items():
+                        f.write(self._encode({'site': site, 'index': int(index), 'Username': entry['Username'],
+                                              'Password': changes.get((site, index), entry['Password'])}))
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+
+            # Closed before the rename, Windows refuses to replace an open file.
+            self._file.close()
+            try:
+                os.replace(tmp_path, self.path)
+            finally:
+                self._file = open(self.path, 'ab')
+            _fsync_dir(self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        for (site, index), password in changes.items():
+            self._data[site][index] = {'Username': self._data[site][index]['Username'], 'Password': password}
+        self._size = size
+        self._records = self._live
+        self._update_stat()
+
+    def _next_index(self, site):
+        return len(self._data.get(site, ()))
+
+    def _lookup(self, site):
+        with self._lock:
+            self.refresh()
+            return dict(self._data[site])
+
+    def sites(self):
+        with self._lock:
+            self.refresh()
+            return list(self._data)
+
+    def sites_since(self, position):
+        with self._lock:
+            self.refresh()
+            return self._site_order[position:], len(self._site_order)
+
+    def sites_for_username(self, username):
+        with self._lock:
+            self.refresh()
+            return list(self._usernames.get(username, ()))
+
+    def entries(self):
+        with self._lock:
+            self.refresh()
+            snapshot = [(site, int(index), entry['Username'], entry['Password'])
+                        for site, entries in self._data.items() for index, entry in entries.items()]
+        yield from snapshot
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._flock.close()
+
+
+class VaultLogAppender(VaultLog):
+    # Write side of a VaultLog for bulk imports: keeps the entry count of every
+    # site, and its usernames when asked to, but never the passwords. Reading
+    # the entries back and rewriting the log are left to a VaultLog.
+
+    def __init__(self, path, usernames=False):
+        self._keep_usernames = usernames
+        self._site_usernames = dict()
+        super().__init__(path)
+
+    def _apply(self, record):
+        site = record['site']
+        username = record['Username']
+        # Dropped like in a VaultLog when the password is missing.
+        record['Password']
+
+        count = self._data.get(site)
+        if count is None:
+            self._site_order.append(site)
+        self._data[site] = (count or 0) + 1
+        self._live += 1
+        if self._keep_usernames:
+            self._site_usernames.setdefault(site, set()).add(username)
+
+    def _next_index(self, site):
+        return self._data.get(site, 0)
+
+    def _lookup(self, site):
+        raise NotImplementedError('VaultLogAppender does not keep the entries, open the log as a VaultLog.')
+
+    def sites_for_username(self, username):
+        raise NotImplementedError('VaultLogAppender does not keep the entries, open the log as a VaultLog.')
+
+    def usernames(self, site):
+        if not self._keep_usernames:
+            raise NotImplementedError('VaultLogAppender was opened without usernames.')
+        with self._lock:
+            self.refresh()
+            return set(self._site_usernames.get(site, ()))
+
+    def entries(self):
+        raise NotImplementedError('VaultLogAppender does not keep the entries, open the log as a VaultLog.')
+
+    def rewrite_passwords(self, transform):
+        raise NotImplementedError('VaultLogAppender does not keep the entries, open the log as a VaultLog.')
+
+    def compact(self):
+        raise NotImplementedError('VaultLogAppender does not keep the entries, open the log as a VaultLog.')
+
+
+class JsonStorage(VaultStorage):
+
+    TMP_SUFFIX = '.tmp'
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._lock = threading.RLock()
+        self._data = dict()
+        self._stat = None
+        self.refresh()
+
+    def refresh(self):
+        with self._lock:
+            try:
+                key = _stat_key(os.stat(self.path))
+            except FileNotFoundError:
+                key = None
+
+            if key == self._stat:
+                return
+
+            if key is None:
+                self._data = dict()
+            else:
+                with open(self.path) as f:
+                    text = f.read()
+                # An empty file is an empty vault, like a missing one.
+                data = json.loads(text) if text.strip() else dict()
+                if not isinstance(data, dict):
+                    raise ValueError(f'expected a JSON object, found {type(data).__name__}.')
+                self._data = data
+            self._stat = key
+            self.stats['reloads'] += 1
+
+    def _write(self):
+        tmp_path = self.path + self.TMP_SUFFIX
+        with open(tmp_path, 'w') as f:
+            json.dump(self._data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.path)
+        self._stat = _stat_key(os.stat(self.path))
+
+    def add_many(self, rows):
+        with self._lock:
+            self.refresh()
+
+            indexes = []
+            for site, username, password in rows:
+                entries = self._data.setdefault(site, dict())
+                index = len(entries)
+                entries[str(index)] = {
+                    'Username': username,
+                    'Password': password
+                }
+                indexes.append(index)
+
+            try:
+                self._write()
+            except OSError:
+                # Forget the unsaved entries, the next refresh reloads the file.
+                self._stat = None
+                raise
+
+        return indexes
+
+    def _lookup(self, site):
+        with self._lock:
+            self.refresh()
+            return dict(self._data[site])
+
+    def sites(self):
+        with self._lock:
+            self.refresh()
+            return list(self._data)
+
+    def sites_for_username(self, username):
+        with self._lock:
+            self.refresh()
+            return [site for site, entries in self._data.items()
+                    if any(entry['Username'] == username for entry in entries.values())]
+
+    def rewrite_passwords(self, transform):
+        with self._lock:
+            self.refresh()
+            changed = 0
+            for site, entries in self._data.items():
+                for entry in entries.values():
+                    password = transform(site, entry['Username'], entry['Password'])
+                    if password != entry['Password']:
+                        entry['Password'] = password
+                        changed += 1
+            if not changed:
+                return 0
+
+            try:
+                self._write()
+            except OSError:
+                # Forget the unsaved passwords, the next refresh reloads the file.
+                self._stat = None
+                raise
+        return changed
+
+    def entries(self):
+        with self._lock:
+            self.refresh()
+            snapshot = [(site, int(index), entry['Username'], entry['Password'])
+                        for site, entries in self._data.items() for index, entry in entries.items()]
+        yield from snapshot
+
+
+class SqliteStorage(VaultStorage):
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS credentials (
+            site TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            username TEXT NOT NULL,
+            password TEXT NOT NULL,
+            PRIMARY KEY (site, idx)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS credentials_username ON credentials (username, site);
+    """
+    FETCH_SIZE = 1000
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.executescript(self.SCHEMA)
+        self._data_version = self.__data_version()
+
+    def __data_version(self):
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def refresh(self):
+        # data_version moves whenever another connection commits.
+        with self._lock:
+            data_version = self.__data_version()
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self.stats['reloads'] += 1
+
+    def add_many(self, rows):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                records = []
+                next_index = dict()
+                for site, username, password in rows:
+                    index = next_index.get(site)
+                    if index is None:
+                        index = self._conn.execute('SELECT COALESCE(MAX(idx) + 1, 0) FROM credentials '
+                                                   'WHERE site = ?', (site,)).fetchone()[0]
+                    next_index[site] = index + 1
+                    records.append((site, index, username, password))
+
+                self._conn.executemany('INSERT INTO credentials VALUES (?, ?, ?, ?)', records)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        return [record[1] for record in records]
+
+    def _lookup(self, site):
+        with self._lock:
+            rows = self._conn.execute('SELECT idx, username, password FROM credentials '
+                                      'WHERE site = ? ORDER BY idx', (site,)).fetchall()
+        if not rows:
+            raise KeyError(site)
+        return {str(index): {'Username': username, 'Password': password} for index, username, password in rows}
+
+    def sites(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT DISTINCT site FROM credentials')]
+
+    def sites_since(self, position):
+        # Sites come back in key order, not in the order they were added, so every call lists them all.
+        return self.sites(), 0
+
+    def sites_for_username(self, username):
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT DISTINCT site FROM credentials '
+                                                         'WHERE username = ?', (username,))]
+
+    def usernames(self, site):
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT username FROM credentials '
+                                                         'WHERE site = ?', (site,))}
+
+    def rewrite_passwords(self, transform):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                changes = []
+                for site, index, username, password in self._conn.execute('SELECT site, idx, username, password '
+                                                                          'FROM credentials'):
+                    new_password = transform(site, username, password)
+                    if new_password != password:
+                        changes.append((new_password, site, index))
+                self._conn.executemany('UPDATE credentials SET password = ? WHERE site = ? AND idx = ?', changes)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return len(changes)
+
+    def entries(self):
+        with self._lock:
+            cursor = self._conn.execute('SELECT site, idx, username, password FROM credentials '
+                                        'ORDER BY site, idx')
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS = {
+    'json': JsonStorage,
+    'log': VaultLog,
+    'sqlite': SqliteStorage
+}
+
+EXTENSIONS = {
+    '.json': 'json',
+    '.log': 'log',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite'
+}
+
+
+def backend_for(path):
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        return EXTENSIONS[extension]
+    except KeyError:
+        raise ValueError(f'Unknown vault file type {extension!r}, '
+                         f'expected one of {", ".join(EXTENSIONS)}.') from None
+
+
+def convert(entries, target, batch_size=1000):
+    # Appends (site, index, username, password) entries, such as another vault's, to target.
+    count = 0
+    batch = []
+    for site, _, username, password in entries:
+        batch.append((site, username, password))
+        if len(batch) >= batch_size:
+            target.add_many(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        target.add_many(batch)
+        count += len(batch)
+    return count
+
+
+def legacy_rows(path):
+    # (site, username, password) rows of a nested {site: {index: {...}}} JSON file,
+    # ValueError when the file cannot be read as one.
+    try:
+        return [(site, username, password) for site, _, username, password in JsonStorage(path).entries()]
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f'{path!r} cannot be read: {e}') from None
+
+
+def open_storage(path, backend=None):
+    backend = backend or backend_for(path)
+    return BACKENDS[backend](path)
+
+
+class VaultWriter:
+
+    # Writer configurations.
+    QUEUE_SIZE = 1024
+    MAX_BATCH = 512
+
+    def __init__(self, storage):
+        self._storage = storage
+        self._queue = queue.Queue(self.QUEUE_SIZE)
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self.pending = 0
+        # Entries failed since the last successful write.
+        self.failed = 0
+        self.last_error = None
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, site, username, password, callback=None):
+        # Blocks while the queue is full, so a stalled disk slows the producer down.
+        with self._lock:
+            self.pending += 1
+        self._queue.put((site, username, password, callback))
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            # Coalesce everything queued behind the first entry into one write.
+            batch = [item]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                indexes = self._storage.add_many([item[:3] for item in batch])
+                error = None
+            except Exception as e:
+                indexes = [None] * len(batch)
+                error = e
+
+            with self._lock:
+                self.pending -= len(batch)
+                if error:
+                    self.failed += len(batch)
+                    self.last_error = error
+                else:
+                    self.failed = 0
+                    self.last_error = None
+
+            for item, index in zip(batch, indexes):
+                self._results.put((item[3], index, error))
+
+    def poll(self):
+        # Runs the callbacks of finished writes on the calling (UI) thread.
+        while True:
+            try:
+                callback, index, error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if callback:
+                callback(index, error)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,100 @@
+"""
+Predictive CPU paddle for Pong.
+
+Instead of simulating the ball frame by frame, the controller solves where
+it meets the paddle's face: the straight path is extended to the face and
+folded back into the field, which is what every wall bounce on the way
+does to it. The prediction is only redone when the ball velocity changes,
+so a frame costs a comparison and a few arithmetic operations. A reaction
+delay and an aiming error make it beatable.
+
+The controller follows the pong_tournament interface, so the same object
+plays the turtle game, tournaments and benchmarks.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Pong%20Game/pong_ai.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+from random import Random
+
+from pong_engine import DOWN, STAY, UP, PongEngine
+
+# (reaction delay in seconds, aiming error in pixels) of each level.
+LEVELS = {
+    'easy': (0.35, 60),
+    'normal': (0.2, 30),
+    'hard': (0.08, 8)
+}
+
+
+def predict_y(engine: PongEngine, face_x: float) -> float:
+    # Ball y when it reaches face_x, with the wall bounces unfolded.
+    ticks = (face_x - engine.ball_x) / engine.ball_dx
+    wall = engine.WALL_POS
+    y = (engine.ball_y + engine.ball_dy * ticks + wall) % (4 * wall)
+    if y > 2 * wall:
+        y = 4 * wall - y
+    return y - wall
+
+
+class PredictiveController:
+    __slots__ = 'reaction', 'error', 'seed', '_engine', '_rng', '_velocity', '_target', '_pending', '_ready_frame'
+
+    def __init__(self, reaction: float = 0.2, error: float = 30, seed=None) -> None:
+        self.reaction = reaction
+        self.error = error
+        self.seed = seed
+        self._engine = None
+
+    @classmethod
+    def level(cls, name: str, seed=None) -> 'PredictiveController':
+        return cls(*LEVELS[name], seed=seed)
+
+    def __reset(self, engine: PongEngine) -> None:
+        self._engine = engine
+        self._rng = Random(self.seed)
+        self._velocity = None
+        self._target = self._pending = 0.0
+        self._ready_frame = 0
+
+    def __getstate__(self):
+        # Only the settings travel to tournament workers, every match starts fresh.
+        return self.reaction, self.error, self.seed
+
+    def __setstate__(self, state) -> None:
+        self.reaction, self.error, self.seed = state
+        self._engine = None
+
+    def __call__(self, engine: PongEngine, side: str) -> int:
+        if engine is not self._engine:
+            self.__reset(engine)
+
+        velocity = engine.ball_dx, engine.ball_dy
+        if velocity != self._velocity:
+            # The ball was hit or bounced, aim again once the reaction delay is over.
+            self._velocity = velocity
+            face_x = engine.PAD_POS - engine.PADDLE_HALF_WIDTH - engine.BALL_RADIUS
+            face_x = -face_x if side == 'l' else face_x
+            approaching = engine.ball_dx < 0 if side == 'l' else engine.ball_dx > 0
+            if approaching:
+                self._pending = predict_y(engine, face_x) + self._rng.uniform(-self.error, self.error)
+            else:
+                self._pending = 0.0
+            self._ready_frame = engine.frame + round(self.reaction / engine.TICK)
+
+        if engine.frame >= self._ready_frame:
+            self._target = self._pending
+
+        if side == 'l':
+            y, vy = engine.l_paddle_y, engine.l_paddle_vy
+        else:
+            y, vy = engine.r_paddle_y, engine.r_paddle_vy
+        offset = self._target - y
+
+        # Brake early enough to stop on the target instead of overshooting it.
+        stopping = vy * vy / (2 * engine.PADDLE_BRAKE)
+        if vy * offset > 0 and abs(offset) <= stopping:
+            return STAY
+        if abs(offset) <= engine.PADDLE_HALF / 4:
+            return STAY
+        return UP if offset > 0 else DOWN
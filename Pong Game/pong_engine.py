@@ -0,0 +1,228 @@
+"""
+Headless Pong engine.
+
+The whole game state is plain numbers on one object and every random serve
+comes from a seeded random.Random, so a match is fully determined by its
+seed and the actions given to step(). The turtle game only draws this
+state, and simulations, bots and tests run without a display.
+
+Each step() advances the game by the fixed timestep TICK. The ball speed
+is in pixels per second, scaled by the difficulty and by every paddle hit,
+and never depends on how often the game is drawn.
+
+Collisions are swept: the ball's path over the tick is tested against the
+walls and against each paddle box grown by the ball radius, the earliest
+hit is resolved and the rest of the path is swept again from there. The
+ball therefore cannot tunnel through a paddle at any speed, and where it
+meets the paddle sets the angle it leaves at.
+
+Actions are held inputs, not moves: UP or DOWN accelerates the paddle up
+to PADDLE_SPEED and STAY lets it brake to a stop, so a bot and a player
+holding a key drive the paddle through the same physics.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Pong%20Game/pong_engine.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import math
+from random import Random
+
+UP, STAY, DOWN = 1, 0, -1
+
+
+class PongEngine:
+    __slots__ = ('_rng', 'difficulty', 'speed', 'ball_x', 'ball_y', 'ball_dx', 'ball_dy',
+                 'prev_ball_x', 'prev_ball_y', 'l_paddle_y', 'r_paddle_y', 'l_paddle_vy', 'r_paddle_vy',
+                 'prev_l_paddle_y', 'prev_r_paddle_y', 'l_score', 'r_score', 'frame', 'winner')
+
+    # Field configurations.
+    WIDTH, HEIGHT = 700, 500
+    STEP_SIZE = 15
+    PADDING = 20
+    X_RANGE = WIDTH // 2
+    Y_RANGE = HEIGHT // 2
+    PAD_POS = (X_RANGE // STEP_SIZE) * STEP_SIZE - PADDING
+    WALL_POS = Y_RANGE - PADDING
+
+    # Paddle and ball configurations, the paddle is 6 x 80 px and the ball 20 px wide.
+    PADDLE_HALF = 40
+    PADDLE_HALF_WIDTH = 3
+    BALL_RADIUS = 10
+
+    # Paddle motion configurations, in pixels per second and pixels per second squared.
+    PADDLE_SPEED = 420
+    PADDLE_ACCEL = 3600
+    PADDLE_BRAKE = 4800
+
+    # Timing configurations, the physics always advances by TICK seconds.
+    TICK = 1 / 60
+
+    # Ball speed configurations, in pixels per second.
+    BALL_SPEED = 75 * math.sqrt(2)
+    MAX_SPEED = 3000
+    SPEEDUP = 1 / 0.9
+
+    # Edge hits leave the paddle at up to this angle from the horizontal, in radians.
+    MAX_BOUNCE_ANGLE = math.radians(60)
+
+    # Collisions resolved per tick, the rest of the tick is moved without further checks.
+    MAX_SUBSTEPS = 8
+
+    MAX_POINTS = 10
+
+    def __init__(self, seed=None, difficulty: float = 1.0) -> None:
+        self._rng = Random(seed)
+        self.difficulty = difficulty
+        self.speed = 0.0
+        self.ball_x = self.ball_y = self.prev_ball_x = self.prev_ball_y = 0.0
+        self.ball_dx = self.ball_dy = 0.0
+        self.l_paddle_y = self.r_paddle_y = self.prev_l_paddle_y = self.prev_r_paddle_y = 0.0
+        self.l_paddle_vy = self.r_paddle_vy = 0.0
+        self.l_score = self.r_score = 0
+        self.frame = 0
+        self.winner = None
+        self.serve()
+
+    def snapshot(self) -> tuple:
+        # Everything restore() needs to continue the match exactly from this tick.
+        return tuple(getattr(self, name) for name in self.__slots__[1:]), self._rng.getstate()
+
+    def restore(self, snapshot: tuple) -> None:
+        values, rng_state = snapshot
+        for name, value in zip(self.__slots__[1:], values):
+            setattr(self, name, value)
+        self._rng.setstate(rng_state)
+
+    def serve(self) -> None:
+        # Keeps the ball direction at 45 degrees, the speed starts over from the difficulty, up to the cap.
+        self.speed = min(self.BALL_SPEED * self.difficulty, self.MAX_SPEED) * self.TICK
+        axis_speed = self.speed / math.sqrt(2)
+        self.ball_dx = axis_speed if self.ball_dx >= 0 else -axis_speed
+        self.ball_dy = axis_speed if self.ball_dy >= 0 else -axis_speed
+        self.ball_x = self.prev_ball_x = 0.0
+        self.ball_y = self.prev_ball_y = float(
+            self._rng.randrange(-(self.WALL_POS - 10), self.WALL_POS - 10, self.STEP_SIZE))
+
+    def move_paddle(self, y: float, velocity: float, action: int) -> tuple:
+        # Returns the paddle (y, velocity) after one tick with action held.
+        tick = self.TICK
+        if action:
+            velocity = max(-self.PADDLE_SPEED, min(self.PADDLE_SPEED, velocity + action * self.PADDLE_ACCEL * tick))
+        elif velocity:
+            brake = self.PADDLE_BRAKE * tick
+            velocity = 0.0 if abs(velocity) <= brake else velocity - math.copysign(brake, velocity)
+
+        y += velocity * tick
+        limit = self.Y_RANGE - self.PADDLE_HALF
+        if abs(y) >= limit:
+            return math.copysign(limit, y), 0.0
+        return y, velocity
+
+    def __paddle_box(self, side: str) -> tuple:
+        # The paddle grown by the ball radius, so the ball can be swept as a point.
+        x = -self.PAD_POS if side == 'l' else self.PAD_POS
+        y = self.l_paddle_y if side == 'l' else self.r_paddle_y
+        half_width = self.PADDLE_HALF_WIDTH + self.BALL_RADIUS
+        half_height = self.PADDLE_HALF + self.BALL_RADIUS
+        return x - half_width, y - half_height, x + half_width, y + half_height
+
+    def __bounce_off_paddle(self, side: str) -> None:
+        # The hit offset from the paddle centre, -1 to 1, sets the angle the ball leaves at.
+        paddle_y = self.l_paddle_y if side == 'l' else self.r_paddle_y
+        offset = (self.ball_y - paddle_y) / (self.PADDLE_HALF + self.BALL_RADIUS)
+        angle = max(-1.0, min(1.0, offset)) * self.MAX_BOUNCE_ANGLE
+        self.speed = min(self.speed * self.SPEEDUP, self.MAX_SPEED * self.TICK)
+        direction = 1 if side == 'l' else -1
+        self.ball_dx = direction * self.speed * math.cos(angle)
+        self.ball_dy = self.speed * math.sin(angle)
+
+    def __move_ball(self, profiler=None) -> None:
+        remaining = 1.0
+        for _ in range(self.MAX_SUBSTEPS):
+            if profiler:
+                profiler.mark('physics')
+            x, y = self.ball_x, self.ball_y
+            dx, dy = self.ball_dx * remaining, self.ball_dy * remaining
+            hit_time, hit = 1.0, None
+
+            # Walls.
+            if dy > 0 and y + dy > self.WALL_POS:
+                hit_time, hit = max(0.0, (self.WALL_POS - y) / dy), 'wall'
+            elif dy < 0 and y + dy < -self.WALL_POS:
+                hit_time, hit = max(0.0, (-self.WALL_POS - y) / dy), 'wall'
+
+            # Paddles, only the one the ball moves towards can be hit.
+            side = 'l' if dx < 0 else 'r'
+            paddle_hit = sweep(x, y, dx, dy, self.__paddle_box(side))
+            if paddle_hit and paddle_hit[0] < hit_time:
+                hit_time, hit = paddle_hit[0], (side, paddle_hit[1])
+
+            self.ball_x = x + dx * hit_time
+            self.ball_y = y + dy * hit_time
+            if hit is not None:
+                remaining *= 1.0 - hit_time
+                if hit == 'wall' or hit[1] == 'y':
+                    self.ball_dy = -self.ball_dy
+                else:
+                    self.__bounce_off_paddle(hit[0])
+            if profiler:
+                profiler.mark('collision')
+            if hit is None:
+                return
+
+        self.ball_x += self.ball_dx * remaining
+        self.ball_y += self.ball_dy * remaining
+
+    def step(self, actions=(STAY, STAY), profiler=None) -> bool:
+        # Advances one tick with the (left, right) paddle actions, returns False once the match is over.
+        # A FrameProfiler given as profiler gets the collision checks charged to a 'collision' phase.
+        if self.winner:
+            return False
+        if self.l_score >= self.MAX_POINTS or self.r_score >= self.MAX_POINTS:
+            self.winner = 'l' if self.l_score >= self.MAX_POINTS else 'r'
+            return False
+
+        self.frame += 1
+        self.prev_l_paddle_y = self.l_paddle_y
+        self.prev_r_paddle_y = self.r_paddle_y
+        self.l_paddle_y, self.l_paddle_vy = self.move_paddle(self.l_paddle_y, self.l_paddle_vy, actions[0])
+        self.r_paddle_y, self.r_paddle_vy = self.move_paddle(self.r_paddle_y, self.r_paddle_vy, actions[1])
+        self.prev_ball_x = self.ball_x
+        self.prev_ball_y = self.ball_y
+
+        self.__move_ball(profiler)
+
+        # Ball out of space control.
+        if abs(self.ball_x) > self.PAD_POS + 30:
+            if self.ball_x < 0:
+                self.r_score += 1
+            else:
+                self.l_score += 1
+            self.serve()
+        return True
+
+
+def sweep(x: float, y: float, dx: float, dy: float, box: tuple):
+    # Slab test of the segment (x, y) + t * (dx, dy), 0 <= t <= 1, against box (left, bottom, right, top).
+    # Returns (t, axis) of the entry point, axis 'x' for a side face and 'y' for a top or bottom face.
+    left, bottom, right, top = box
+    if left < x < right and bottom < y < top:
+        # A ball already inside, e.g. after the paddle moved onto it, passes through.
+        return None
+
+    t_enter, t_exit, axis = -math.inf, math.inf, None
+    for position, delta, low, high, name in ((x, dx, left, right, 'x'), (y, dy, bottom, top, 'y')):
+        if delta == 0:
+            if not low <= position <= high:
+                return None
+            continue
+        near, far = (low - position) / delta, (high - position) / delta
+        if near > far:
+            near, far = far, near
+        if near > t_enter:
+            t_enter, axis = near, name
+        t_exit = min(t_exit, far)
+
+    if axis is None or t_enter > t_exit or not 0 <= t_enter <= 1:
+        return None
+    return t_enter, axis
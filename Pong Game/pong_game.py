@@ -1,68 +1,71 @@
 """
 Pong game using turtle module.
 
+The field is drawn with retained canvas items on the turtle screen: a frame
+moves the ball and paddle items and rewrites the score text only when a
+score changed.
+
 :URL: https://github.com/nknantha/PyScripts/tree/main/Pong%20Game/pong_game.py
 :Author: NanthaKumar<https://github.com/nknantha>
 :Date: 2021/09/26
 """
+import argparse
 from turtle import Turtle, Screen
-from time import sleep
+from time import perf_counter
 from random import randrange
 
+from frame_profiler import FrameProfiler, Overlay
+from pong_ai import LEVELS, PredictiveController
+from pong_engine import PongEngine
+from pong_net import DEFAULT_PORT, PongClient
+from pong_replay import Replay, seed_type
+
 
-class Paddle(Turtle):
+class Paddle:
 
     # Paddle configurations.
-    PADDLE_SIZE = 4.0
     PADDLE_COLOR = 'white'
+    HALF_WIDTH = PongEngine.PADDLE_HALF_WIDTH
+    HALF_HEIGHT = PongEngine.PADDLE_HALF
 
-    def __init__(self, step_size: int, x_range: int, y_range: int) -> None:
-        super().__init__(shape='square')
-        self.shapesize(0.3, self.PADDLE_SIZE, outline=2)
-        self.up()
-        self.setheading(90)
-        self.color(self.PADDLE_COLOR)
-        self.step_size = step_size
-        self.x_range = x_range
-        self.y_range = y_range
-
-    def __is_movable(self, cor: float) -> bool:
-        return -self.y_range < cor < self.y_range
-
-    def go_up(self) -> None:
-        if self.__is_movable(round(self.ycor(), 2) + self.PADDLE_SIZE * 10 + self.step_size):
-            self.fd(self.step_size)
+    def __init__(self, canvas, x: int) -> None:
+        self._canvas = canvas
+        self._x = x
+        self._y = None
+        self._item = canvas.create_rectangle(0, 0, 0, 0, fill=self.PADDLE_COLOR, outline=self.PADDLE_COLOR, width=2)
+        self.move_to(0)
 
-    def go_down(self) -> None:
-        if self.__is_movable(round(self.ycor(), 2) - self.PADDLE_SIZE * 10 - self.step_size):
-            self.bk(self.step_size)
+    def move_to(self, y: float) -> None:
+        # The canvas item is only touched when the paddle moved a whole pixel, canvas y points down.
+        y = round(y)
+        if y != self._y:
+            self._y = y
+            self._canvas.coords(self._item, self._x - self.HALF_WIDTH, -y - self.HALF_HEIGHT,
+                                self._x + self.HALF_WIDTH, -y + self.HALF_HEIGHT)
 
 
-class Ball(Turtle):
+class Ball:
 
     # Ball configurations.
-    BALL_SIZE = 1
-    BALL_SHAPE = 'circle'
+    BALL_RADIUS = PongEngine.BALL_RADIUS
     BALL_COLOR = 'white'
 
-    def __init__(self, step_size: int) -> None:
-        super().__init__(shape=self.BALL_SHAPE)
-        self.up()
-        self.color(self.BALL_COLOR)
-        self.shapesize(self.BALL_SIZE, self.BALL_SIZE)
+    def __init__(self, canvas) -> None:
+        self._canvas = canvas
+        self._pos = None
+        self._item = canvas.create_oval(0, 0, 0, 0, fill=self.BALL_COLOR, outline=self.BALL_COLOR)
+        self.move_to(0, 0)
 
-        self.x_step = self.y_step = step_size
+    def move_to(self, x: float, y: float) -> None:
+        pos = round(x), round(y)
+        if pos != self._pos:
+            self._pos = pos
+            x, y = pos
+            self._canvas.coords(self._item, x - self.BALL_RADIUS, -y - self.BALL_RADIUS,
+                                x + self.BALL_RADIUS, -y + self.BALL_RADIUS)
 
-    def move(self) -> None:
-        new_x = self.xcor() + self.x_step
-        new_y = self.ycor() + self.y_step
-        self.goto(new_x, new_y)
-
-    def vertical_bounce(self) -> None:
-        self.y_step *= -1
-
-    def horizontal_bounce(self) -> None:
-        self.x_step *= -1
+    def hide(self) -> None:
+        self._canvas.itemconfigure(self._item, state='hidden')
 
 
 class ScoreBoard:
@@ -71,28 +74,30 @@ class ScoreBoard:
     FONT = ('Arial', 28, 'bold')
     SPACING = 20
     COLOR = 'white'
-    MAX_POINTS = 10
+    MAX_POINTS = PongEngine.MAX_POINTS
 
-    def __init__(self, top_pos: int) -> None:
+    def __init__(self, canvas, top_pos: int) -> None:
         self.l_score = 0
         self.r_score = 0
 
-        self._l_tur = Turtle(visible=False)
-        self._l_tur.up()
-        self._l_tur.color(self.COLOR)
-        self._l_tur.goto(-self.SPACING, top_pos)
+        # Retained text items, rewritten only when a score changes.
+        self._canvas = canvas
+        self._top_pos = top_pos
+        self._drawn = None
+        self._l_item = self.__text(-self.SPACING, 'se')
+        self._r_item = self.__text(self.SPACING, 'sw')
 
-        self._r_tur = Turtle(visible=False)
-        self._r_tur.up()
-        self._r_tur.color(self.COLOR)
-        self._r_tur.goto(self.SPACING, top_pos)
+    def __text(self, x: int, anchor: str, text: str = ''):
+        # Canvas y points down, the anchors match turtle's write() alignments.
+        return self._canvas.create_text(x, -self._top_pos, text=text, anchor=anchor,
+                                        fill=self.COLOR, font=self.FONT)
 
     def update(self) -> None:
-        self._r_tur.clear()
-        self._l_tur.clear()
-
-        self._r_tur.write(self.r_score, align='left', font=self.FONT)
-        self._l_tur.write(self.l_score, align='right', font=self.FONT)
+        scores = self.l_score, self.r_score
+        if scores != self._drawn:
+            self._drawn = scores
+            self._canvas.itemconfigure(self._l_item, text=self.l_score)
+            self._canvas.itemconfigure(self._r_item, text=self.r_score)
 
     def is_player_win(self):
 
@@ -102,10 +107,8 @@ class ScoreBoard:
             elif self.r_score >= self.MAX_POINTS:
                 l_text, r_text = 'LOSS', 'WIN'
 
-            self._l_tur.bk(100)
-            self._r_tur.fd(100)
-            self._l_tur.write(l_text, align='right', font=self.FONT)
-            self._r_tur.write(r_text, align='left', font=self.FONT)
+            self.__text(-self.SPACING - 100, 'se', l_text)
+            self.__text(self.SPACING + 100, 'sw', r_text)
 
             return True
         return False
@@ -113,18 +116,53 @@ class ScoreBoard:
 
 class PongGame:
 
-    # Game configurations.
-    SCREEN_WIDTH, SCREEN_HEIGHT = 700, 500
+    # Game configurations, the field geometry comes from the engine.
+    SCREEN_WIDTH, SCREEN_HEIGHT = PongEngine.WIDTH, PongEngine.HEIGHT
     SCREEN_BGCOLOR = 'black'
     SCREEN_TITLE = 'Pong Game'
 
-    STEP_SIZE = 15
-    PADDING = 20
-    X_RANGE = int(SCREEN_WIDTH // 2)
-    Y_RANGE = int(SCREEN_HEIGHT // 2)
-    PAD_POS = int((X_RANGE // STEP_SIZE) * STEP_SIZE) - PADDING
+    PADDING = PongEngine.PADDING
+    Y_RANGE = PongEngine.Y_RANGE
+    PAD_POS = PongEngine.PAD_POS
+
+    # Frame configurations, a long stall is dropped instead of replayed at once.
+    FPS = 60
+    MAX_FRAME_TIME = 0.25
+
+    # (up, down) keys of each paddle.
+    L_KEYS = ('w', 's')
+    R_KEYS = ('Up', 'Down')
+
+    def __init__(self, seed=None, difficulty: float = 1.0, cpu_side: str = None, cpu_level: str = 'normal',
+                 record: str = None, replay: Replay = None, replay_speed: float = 1.0,
+                 client: PongClient = None, profiler: FrameProfiler = None, overlay: bool = False) -> None:
+        # Engine setup, the same seed and inputs replay the same match.
+        if replay:
+            seed, difficulty = replay.seed, replay.difficulty
+        elif seed is None:
+            seed = randrange(2 ** 63)
+        self._engine = PongEngine(seed, difficulty)
+
+        # CPU opponent setup, cpu_side is 'l' or 'r' for a single player game.
+        self._cpu_side = cpu_side
+        self._cpu = PredictiveController.level(cpu_level, seed) if cpu_side else None
+
+        # Replay setup, a game is either recorded to a file or played back from a replay.
+        self._record_file = record
+        self._recording = Replay(seed, difficulty) if record else None
+        self._replay = replay
+        self._replay_speed = replay_speed
+
+        # Network setup, a client game only draws the state the server sends.
+        self._client = client
+
+        # Profiling setup, None when off so the frame loop skips it.
+        self._profiler = profiler
+
+        # Frame loop state.
+        self._accumulator = 0.0
+        self._last_time = 0.0
 
-    def __init__(self) -> None:
         # Screen setup.
         self.__setup_screen()
 
@@ -137,8 +175,10 @@ class PongGame:
         # Score board setup.
         self.__setup_scoreboard()
 
+        self._overlay = Overlay(profiler, -self.PAD_POS, -self.Y_RANGE + 5) if profiler and overlay else None
+
     def __setup_scoreboard(self) -> None:
-        self._scoreboard = ScoreBoard(self.Y_RANGE - self.PADDING * 3)
+        self._scoreboard = ScoreBoard(self.screen.getcanvas(), self.Y_RANGE - self.PADDING * 3)
 
     def __setup_screen(self) -> None:
         self.screen = Screen()
@@ -152,98 +192,173 @@ class PongGame:
         self.screen.bgcolor(self.SCREEN_BGCOLOR)
 
     def __setup_ball(self) -> None:
-        self._ball = Ball(self.STEP_SIZE)
+        self._ball = Ball(self.screen.getcanvas())
 
     def __setup_paddles(self) -> None:
         # Left paddle.
-        self._l_paddle = Paddle(self.STEP_SIZE, self.PAD_POS, self.Y_RANGE)
-        self._l_paddle.goto(-self.PAD_POS, 0)
-        self.screen.onkeyrelease(self._l_paddle.go_up, 'w')
-        self.screen.onkeyrelease(self._l_paddle.go_down, 's')
+        self._l_paddle = Paddle(self.screen.getcanvas(), -self.PAD_POS)
 
         # Right paddle.
-        self._r_paddle = Paddle(self.STEP_SIZE, self.PAD_POS, self.Y_RANGE)
-        self._r_paddle.goto(self.PAD_POS, 0)
-        self.screen.onkeyrelease(self._r_paddle.go_up, 'Up')
-        self.screen.onkeyrelease(self._r_paddle.go_down, 'Down')
-
-    def __hold_game(self):
-        turtle = Turtle(visible=False)
-        turtle.up()
-        turtle.goto(0, -self.Y_RANGE + self.PADDING + 10)
-        turtle.color('white')
-        turtle.write("Press 'SpaceBar' to start the game...", align='center', font=('Arial', 25, 'normal'))
-
-        space_pressed = [0]
-
-        def press_space():
-            space_pressed.pop()
+        self._r_paddle = Paddle(self.screen.getcanvas(), self.PAD_POS)
+
+        # Held keys, the handlers only flip a flag and the game loop reads them once per frame.
+        self._keys = dict.fromkeys(self.L_KEYS + self.R_KEYS, False)
+        for key in self._keys:
+            self.screen.onkeypress(lambda key=key: self._keys.__setitem__(key, True), key)
+            self.screen.onkeyrelease(lambda key=key: self._keys.__setitem__(key, False), key)
+
+    def __actions(self) -> tuple:
+        keys = self._keys
+        return (keys[self.L_KEYS[0]] - keys[self.L_KEYS[1]],
+                keys[self.R_KEYS[0]] - keys[self.R_KEYS[1]])
+
+    def __render(self, alpha: float = 1.0) -> None:
+        # alpha is how far the time is between the last two physics ticks, Tk draws the moved items when idle.
+        engine = self._engine
+        self._ball.move_to(engine.prev_ball_x + (engine.ball_x - engine.prev_ball_x) * alpha,
+                           engine.prev_ball_y + (engine.ball_y - engine.prev_ball_y) * alpha)
+        self._l_paddle.move_to(engine.prev_l_paddle_y + (engine.l_paddle_y - engine.prev_l_paddle_y) * alpha)
+        self._r_paddle.move_to(engine.prev_r_paddle_y + (engine.r_paddle_y - engine.prev_r_paddle_y) * alpha)
+        self._scoreboard.l_score = engine.l_score
+        self._scoreboard.r_score = engine.r_score
+        self._scoreboard.update()
 
-        self.screen.onkey(press_space, 'space')
-        while space_pressed:
-            self.screen.update()
+    def __hold_game(self, message: str = "Press 'SpaceBar' to start the game...") -> None:
+        # Waits for the space bar without polling, the Tk event loop wakes the game up.
+        self._hold_turtle = Turtle(visible=False)
+        self._hold_turtle.up()
+        self._hold_turtle.goto(0, -self.Y_RANGE + self.PADDING + 10)
+        self._hold_turtle.color('white')
+        self._hold_turtle.write(message, align='center', font=('Arial', 25, 'normal'))
+        self.screen.update()
+        if not self._client:
+            self.screen.onkey(self.__start, 'space')
 
-        turtle.clear()
+    def __start(self) -> None:
+        self._hold_turtle.clear()
         self.screen.onkey(None, 'space')
+        self._last_time = perf_counter()
+        if self._profiler:
+            self._profiler.start()
+        self.screen.ontimer(self.__frame, 1000 // self.FPS)
+
+    def __frame(self) -> None:
+        profiler = self._profiler
+        if profiler:
+            profiler.mark('sleep')
+        now = perf_counter()
+        self._accumulator += min(now - self._last_time, self.MAX_FRAME_TIME) * self._replay_speed
+        self._last_time = now
+
+        # Fixed timestep: the physics catches up in whole ticks, the leftover interpolates the drawing.
+        tick = self._engine.TICK
+        actions = self.__actions()
+        running = True
+        while running and self._accumulator >= tick:
+            if self._replay:
+                frame = self._engine.frame
+                actions = self._replay.actions(frame) if frame < len(self._replay) else (0, 0)
+            elif self._cpu:
+                cpu_action = self._cpu(self._engine, self._cpu_side)
+                actions = (cpu_action, actions[1]) if self._cpu_side == 'l' else (actions[0], cpu_action)
+            running = self._engine.step(actions, profiler)
+            if running and self._recording:
+                self._recording.record(actions)
+            self._accumulator -= tick
+        if profiler:
+            profiler.mark('physics')
+
+        if not running:
+            self.__render()
+            self.__game_over()
+            return
+
+        self.__render(self._accumulator / tick)
+        if profiler:
+            # Tk draws the moved items when idle, flushing here times the drawing as its own phase.
+            profiler.mark('render')
+            self.screen.getcanvas().update_idletasks()
+            profiler.mark('update')
+            if self._overlay:
+                self._overlay.refresh()
+            profiler.end_frame(self._engine.speed / self._engine.TICK)
+        spent_ms = (perf_counter() - now) * 1000
+        self.screen.ontimer(self.__frame, max(1, round(1000 / self.FPS - spent_ms)))
+
+    def __net_frame(self) -> None:
+        # Either key pair moves the own paddle, the opponent plays on another machine.
+        client = self._client
+        if client.started:
+            if self._hold_turtle:
+                self._hold_turtle.clear()
+                self._hold_turtle = None
+            keys = self._keys
+            up, down = keys[self.L_KEYS[0]] or keys[self.R_KEYS[0]], keys[self.L_KEYS[1]] or keys[self.R_KEYS[1]]
+            client.action = up - down
+            self._engine = client.update_view()
+            self.__render()
+
+        if client.finished:
+            if client.started:
+                self.__game_over()
+            elif self._hold_turtle:
+                self._hold_turtle.clear()
+                self._hold_turtle.write('Could not join the game.', align='center', font=('Arial', 25, 'normal'))
+            return
+        self.screen.ontimer(self.__net_frame, 1000 // self.FPS)
+
+    def __game_over(self) -> None:
+        if self._recording:
+            self._recording.finish(self._engine)
+            self._recording.save(self._record_file)
+        self._scoreboard.is_player_win()
+        self._ball.hide()
 
     def run(self) -> None:
 
-        wall_pos = self.Y_RANGE - self.PADDING
-        paddle_x = self._r_paddle.xcor()
-        speed = 0.2
-
         self.screen.listen()
-        self._ball.goto(0, randrange(-(wall_pos - 10), (wall_pos - 10), self.STEP_SIZE))
-        self._scoreboard.update()
-        self.screen.update()
-
-        self.__hold_game()
-
-        while True:
-
-            # Checking for win.
-            if self._scoreboard.is_player_win():
-                break
-
-            # Wall Bounce.
-            if abs(round(self._ball.ycor(), 2)) >= wall_pos:
-                self._ball.vertical_bounce()
-
-            # Ball out of space control.
-            if abs(self._ball.xcor()) > paddle_x + 30:
-                if self._ball.xcor() < 0:
-                    self._scoreboard.r_score += 1
-                else:
-                    self._scoreboard.l_score += 1
-                self._ball.goto(0, randrange(-(wall_pos - 10), (wall_pos - 10), self.STEP_SIZE))
-                speed = 0.2
-
-            ball_x_pos = round(self._ball.xcor(), 2) + 10
-            ball_y_pos = round(self._ball.ycor(), 2) + 10
-            r_paddle_y_pos = round(self._r_paddle.ycor(), 2)
-            l_paddle_y_pos = round(self._l_paddle.ycor(), 2)
-
-            # Right Paddle Bounce.
-            if paddle_x - 10 <= ball_x_pos <= ball_x_pos \
-                    and r_paddle_y_pos - 45 <= ball_y_pos <= r_paddle_y_pos + 45:
-                self._ball.horizontal_bounce()
-                speed *= 0.9
-
-            # Left Paddle Bounce.
-            if -(paddle_x - 10) <= ball_x_pos <= -(paddle_x - 20) \
-                    and l_paddle_y_pos - 45 <= ball_y_pos <= l_paddle_y_pos + 45:
-                self._ball.horizontal_bounce()
-                speed *= 0.9
-
-            self._ball.move()
-            self._scoreboard.update()
-            self.screen.update()
-            sleep(speed)
-
-        self._ball.ht()
-        self.screen.update()
+        self.__render()
+
+        if self._client:
+            self.__hold_game('Waiting for the other player...')
+            self._client.start_thread()
+            self.screen.ontimer(self.__net_frame, 1000 // self.FPS)
+        else:
+            self.__hold_game()
         self.screen.mainloop()
 
+        if self._profiler:
+            print(self._profiler.report())
+
 
 if __name__ == '__main__':
-    PongGame().run()
+    parser = argparse.ArgumentParser(description='Pong game, two players or one against the CPU.')
+    parser.add_argument('--cpu', choices=('l', 'r'), help='paddle played by the CPU, left or right')
+    parser.add_argument('--level', choices=LEVELS, default='normal', help='CPU level (default: %(default)s)')
+    parser.add_argument('--speed', type=float, default=1.0, help='ball speed factor (default: %(default)s)')
+    parser.add_argument('--seed', type=seed_type, help='seed of the serves, 0 to 2**64-1')
+    parser.add_argument('--record', metavar='FILE', help='save a replay of the match to FILE')
+    parser.add_argument('--replay', metavar='FILE', help='play back a recorded match instead')
+    parser.add_argument('--replay-speed', type=float, default=1.0, help='playback speed factor (default: %(default)s)')
+    parser.add_argument('--connect', metavar='HOST[:PORT]', help='join a pong_net.py server on the LAN')
+    parser.add_argument('--profile', metavar='FILE', help='save per-frame timings to FILE, .csv or .json')
+    parser.add_argument('--overlay', action='store_true', help='show the FPS and frame times on the screen')
+    parser.add_argument('--cprofile', type=int, default=0, metavar='N', help='run the first N frames under cProfile')
+    args = parser.parse_args()
+
+    try:
+        replay = Replay.load(args.replay) if args.replay else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    client = None
+    if args.connect:
+        host, _, port = args.connect.partition(':')
+        client = PongClient(host, int(port) if port else DEFAULT_PORT)
+    profiler = None
+    if args.profile or args.overlay or args.cprofile:
+        profiler = FrameProfiler(('sleep', 'physics', 'collision', 'render', 'update'), load='ball_speed',
+                                 cprofile_frames=args.cprofile)
+    PongGame(args.seed, args.speed, args.cpu, args.level, args.record, replay, args.replay_speed,
+             client, profiler, args.overlay).run()
+    if args.profile:
+        profiler.save(args.profile)
@@ -0,0 +1,343 @@
+"""
+Two player Pong over a LAN with asyncio.
+
+The server runs the only real PongEngine at the fixed tick rate and
+applies each client's paddle inputs in the order they were sent. Clients
+send one small input message per tick over TCP. The server sends each
+client SNAPSHOT_RATE state messages a second, each holding only the fields
+that changed since the previous message to that client, so a client uses
+well under 1 KB/s in each direction.
+
+A client predicts its own paddle: it applies its inputs at once with the
+engine's paddle physics, and when a snapshot acknowledges an input it
+restarts from the server's paddle and replays the inputs still in flight.
+The ball and the other paddle are shown INTERP_DELAY behind the server,
+interpolated between the two snapshots around that time.
+
+Usage:
+    python pong_net.py server --port 5555
+    python pong_game.py --connect 192.168.1.10:5555
+    python pong_net.py bench --seconds 10
+    python -m unittest test_pong_net
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Pong%20Game/pong_net.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import argparse
+import asyncio
+import bisect
+import collections
+import struct
+import threading
+import time
+
+from pong_engine import STAY, PongEngine
+from pong_replay import MAX_SEED, seed_type
+from pong_tournament import track
+
+DEFAULT_PORT = 5555
+SNAPSHOT_RATE = 20
+INTERP_DELAY = 0.1
+
+# Inputs a client may run ahead of the server before the oldest are skipped.
+MAX_INPUT_LAG = 6
+
+MSG_WELCOME, MSG_INPUT, MSG_STATE = 1, 2, 3
+WELCOME = struct.Struct('<BcQd')
+INPUT = struct.Struct('<BIb')
+STATE = struct.Struct('<BIIH')
+FIELD = struct.Struct('<f')
+
+# Engine fields sent in state messages, bit i of the mask marks FIELDS[i] as present.
+FIELDS = ('ball_x', 'ball_y', 'ball_dx', 'ball_dy', 'l_paddle_y', 'r_paddle_y',
+          'l_paddle_vy', 'r_paddle_vy', 'l_score', 'r_score')
+
+
+class _Player:
+    __slots__ = 'writer', 'inputs', 'action', 'ack', 'sent', 'connected', 'bytes_sent'
+
+    def __init__(self, writer) -> None:
+        self.writer = writer
+        self.inputs = collections.deque()
+        self.action = STAY
+        self.ack = 0
+        self.sent = [None] * len(FIELDS)
+        self.connected = True
+        self.bytes_sent = 0
+
+
+class PongServer:
+
+    def __init__(self, seed: int, difficulty: float = 1.0) -> None:
+        # The seed goes out in the unsigned WELCOME field, like in a replay header.
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f'Seed must be between 0 and {MAX_SEED}, got {seed}.')
+        self.seed = seed
+        self.difficulty = difficulty
+        self.engine = PongEngine(seed, difficulty)
+        self.players = dict()
+        self._ready = asyncio.Event()
+
+    async def handle(self, reader, writer) -> None:
+        side = next((side for side in 'lr' if side not in self.players), None)
+        if side is None:
+            writer.close()
+            return
+
+        player = self.players[side] = _Player(writer)
+        writer.write(WELCOME.pack(MSG_WELCOME, side.encode(), self.seed, self.difficulty))
+        if len(self.players) == 2:
+            self._ready.set()
+
+        try:
+            while True:
+                _, sequence, action = INPUT.unpack(await reader.readexactly(INPUT.size))
+                player.inputs.append((sequence, action))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            player.connected = False
+
+    def __send_state(self, tick: int) -> None:
+        engine = self.engine
+        values = [getattr(engine, name) for name in FIELDS]
+        for player in self.players.values():
+            mask = 0
+            changed = []
+            for i, value in enumerate(values):
+                if value != player.sent[i]:
+                    mask |= 1 << i
+                    changed.append(FIELD.pack(value))
+                    player.sent[i] = value
+            message = STATE.pack(MSG_STATE, tick, player.ack, mask) + b''.join(changed)
+            player.writer.write(message)
+            player.bytes_sent += len(message)
+
+    async def run(self) -> None:
+        await self._ready.wait()
+        loop = asyncio.get_running_loop()
+        snapshot_ticks = round(1 / (SNAPSHOT_RATE * PongEngine.TICK))
+        start = loop.time()
+        tick = 0
+        running = True
+
+        while running and all(player.connected for player in self.players.values()):
+            actions = []
+            for side in 'lr':
+                player = self.players[side]
+                while len(player.inputs) > MAX_INPUT_LAG:
+                    player.inputs.popleft()
+                if player.inputs:
+                    player.ack, player.action = player.inputs.popleft()
+                actions.append(player.action)
+
+            running = self.engine.step(actions)
+            tick += 1
+            if not running or not tick % snapshot_ticks:
+                self.__send_state(tick)
+            await asyncio.sleep(max(0.0, start + tick * PongEngine.TICK - loop.time()))
+
+        for player in self.players.values():
+            try:
+                await player.writer.drain()
+            except ConnectionError:
+                pass
+            player.writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await self.run()
+
+
+class PongClient:
+
+    def __init__(self, host: str, port: int, controller=None) -> None:
+        self.host = host
+        self.port = port
+        self.controller = controller
+        self.side = None
+        self.seed = None
+        self.view = None
+        self.action = STAY
+        self.finished = False
+        self.bytes_sent = self.bytes_received = 0
+        self.corrections = collections.deque(maxlen=1024)
+
+        # Snapshots (server tick, field values) shared with the rendering thread.
+        self._lock = threading.Lock()
+        self._ticks = collections.deque(maxlen=32)
+        self._snapshots = collections.deque(maxlen=32)
+        self._values = [0.0] * len(FIELDS)
+        self._clock = None
+
+        # Own paddle prediction, (y, velocity) and the inputs the server has not applied yet.
+        self._predicted = (0.0, 0.0)
+        self._pending = collections.deque()
+        self._sequence = 0
+
+    @property
+    def started(self) -> bool:
+        return self._clock is not None
+
+    async def __receive(self, reader) -> None:
+        own_y, own_vy = FIELDS.index(self.side + '_paddle_y'), FIELDS.index(self.side + '_paddle_vy')
+        try:
+            while True:
+                header = await reader.readexactly(STATE.size)
+                _, tick, ack, mask = STATE.unpack(header)
+                count = bin(mask).count('1')
+                body = await reader.readexactly(count * FIELD.size)
+                self.bytes_received += len(header) + len(body)
+
+                fields = iter(FIELD.iter_unpack(body))
+                for i in range(len(FIELDS)):
+                    if mask & 1 << i:
+                        self._values[i] = next(fields)[0]
+                with self._lock:
+                    self._ticks.append(tick)
+                    self._snapshots.append(tuple(self._values))
+                    self._clock = tick, time.perf_counter()
+
+                # Reconcile: restart from the server's paddle and replay the inputs it has not seen.
+                while self._pending and self._pending[0][0] <= ack:
+                    self._pending.popleft()
+                y, vy = self._values[own_y], self._values[own_vy]
+                for _, action in self._pending:
+                    y, vy = self.view.move_paddle(y, vy, action)
+                self.corrections.append(abs(y - self._predicted[0]))
+                self._predicted = y, vy
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.finished = True
+
+    async def __send_inputs(self, writer) -> None:
+        loop = asyncio.get_running_loop()
+        while not self.started and not self.finished:
+            await asyncio.sleep(PongEngine.TICK)
+
+        start = loop.time()
+        while not self.finished:
+            if self.controller:
+                self.update_view()
+                self.action = self.controller(self.view, self.side)
+
+            self._sequence += 1
+            action = self.action
+            self._pending.append((self._sequence, action))
+            self._predicted = self.view.move_paddle(*self._predicted, action)
+            writer.write(INPUT.pack(MSG_INPUT, self._sequence, action))
+            self.bytes_sent += INPUT.size
+            await asyncio.sleep(max(0.0, start + self._sequence * PongEngine.TICK - loop.time()))
+
+    async def run(self) -> None:
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            # No server.
+            self.finished = True
+            return
+        try:
+            _, side, seed, difficulty = WELCOME.unpack(await reader.readexactly(WELCOME.size))
+        except (OSError, asyncio.IncompleteReadError):
+            # The match already has two players.
+            writer.close()
+            self.finished = True
+            return
+        self.side = side.decode()
+        self.seed = seed
+        self.view = PongEngine(seed, difficulty)
+
+        try:
+            await asyncio.gather(self.__receive(reader), self.__send_inputs(writer))
+        finally:
+            writer.close()
+
+    def update_view(self) -> PongEngine:
+        # Moves self.view to the interpolated server state, with the own paddle predicted.
+        with self._lock:
+            if self._clock is None:
+                return self.view
+            clock_tick, clock_time = self._clock
+            target = clock_tick + (time.perf_counter() - clock_time - INTERP_DELAY) / PongEngine.TICK
+            position = bisect.bisect_right(self._ticks, target)
+            if position == 0:
+                values = before = self._snapshots[0]
+                alpha = 0.0
+            elif position == len(self._ticks):
+                values = before = self._snapshots[-1]
+                alpha = 0.0
+            else:
+                before, values = self._snapshots[position - 1], self._snapshots[position]
+                alpha = (target - self._ticks[position - 1]) / (self._ticks[position] - self._ticks[position - 1])
+            latest = self._snapshots[-1]
+
+        view = self.view
+        for name, old, new in zip(FIELDS, before, values):
+            setattr(view, name, old + (new - old) * alpha)
+        view.l_score, view.r_score = int(latest[FIELDS.index('l_score')]), int(latest[FIELDS.index('r_score')])
+        setattr(view, self.side + '_paddle_y', self._predicted[0])
+        setattr(view, self.side + '_paddle_vy', self._predicted[1])
+        view.prev_ball_x, view.prev_ball_y = view.ball_x, view.ball_y
+        view.prev_l_paddle_y, view.prev_r_paddle_y = view.l_paddle_y, view.r_paddle_y
+        return view
+
+    def start_thread(self) -> threading.Thread:
+        # Runs the client on its own event loop, for a Tk game loop in the main thread.
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        thread.start()
+        return thread
+
+
+async def _bench(seconds: float, seed: int) -> None:
+    server = PongServer(seed)
+    listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    clients = [PongClient('127.0.0.1', port, track) for _ in range(2)]
+
+    start = time.perf_counter()
+    server_task = asyncio.create_task(server.run())
+    client_tasks = [asyncio.create_task(client.run()) for client in clients]
+    await asyncio.wait([server_task], timeout=seconds)
+    elapsed = time.perf_counter() - start
+
+    # Clients hang up first, so the server's connection handlers end on their own.
+    for task in client_tasks + [server_task]:
+        task.cancel()
+    await asyncio.gather(*client_tasks, server_task, return_exceptions=True)
+    listener.close()
+    await listener.wait_closed()
+
+    print(f'{server.engine.frame} ticks in {elapsed:.1f}s, score {server.engine.l_score}-{server.engine.r_score}.')
+    for client in clients:
+        player = server.players[client.side]
+        corrections = sorted(client.corrections) or [0.0]
+        print(f'Client {client.side}: {client.bytes_sent / elapsed / 1024:.2f} KB/s up, '
+              f'{player.bytes_sent / elapsed / 1024:.2f} KB/s down, prediction correction '
+              f'median {corrections[len(corrections) // 2]:.2f}px, max {corrections[-1]:.2f}px.')
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='LAN two player Pong.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    server_parser = commands.add_parser('server', help='host a match for two pong_game.py --connect clients')
+    server_parser.add_argument('--host', default='0.0.0.0', help='address to listen on (default: %(default)s)')
+    server_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port (default: %(default)s)')
+    server_parser.add_argument('--seed', type=seed_type, default=0, help='seed of the serves (default: %(default)s)')
+    server_parser.add_argument('--speed', type=float, default=1.0, help='ball speed factor (default: %(default)s)')
+
+    bench_parser = commands.add_parser('bench', help='play two bots over loopback and report the bandwidth')
+    bench_parser.add_argument('--seconds', type=float, default=10, help='match time (default: %(default)s)')
+    bench_parser.add_argument('--seed', type=seed_type, default=0, help='seed of the serves (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'server':
+        print(f'Waiting for two players on {args.host}:{args.port}...')
+        asyncio.run(PongServer(args.seed, args.speed).serve(args.host, args.port))
+    else:
+        asyncio.run(_bench(args.seconds, args.seed))
+
+
+if __name__ == '__main__':
+    main()
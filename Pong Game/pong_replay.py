@@ -0,0 +1,184 @@
+"""
+Binary replays of Pong matches.
+
+The engine is deterministic, so a replay stores only what it cannot
+recompute: a header with the seed, the ball speed factor, the tick count and
+the final score, then the paddle inputs of every tick as 2-bit codes, two
+ticks to a byte, zlib compressed. Inputs change rarely next to 60 ticks a
+second, so a ten minute match takes a few KB.
+
+Playback re-simulates the match headless, far faster than real time.
+Engine snapshots are kept in memory every KEYFRAME_INTERVAL ticks on the
+way, so seeking replays at most one interval.
+
+Usage:
+    python pong_replay.py verify match.pongreplay
+    python pong_replay.py rallies match.pongreplay --min-hits 6
+    python pong_game.py --replay match.pongreplay --replay-speed 4
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Pong%20Game/pong_replay.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import argparse
+import bisect
+import struct
+import time
+import zlib
+
+from pong_engine import DOWN, STAY, UP, PongEngine
+
+MAGIC = b'PONG'
+VERSION = 1
+HEADER = struct.Struct('<4sBQdIBB')
+MAX_SEED = 2 ** 64 - 1
+KEYFRAME_INTERVAL = 600
+
+# 2-bit code of each paddle action, the left paddle in the low bits of a tick's nibble.
+CODES = {STAY: 0, UP: 1, DOWN: 2}
+ACTIONS = tuple((l_action, r_action) for r_action in (STAY, UP, DOWN, STAY) for l_action in (STAY, UP, DOWN, STAY))
+
+
+class Replay:
+    __slots__ = 'seed', 'difficulty', 'l_score', 'r_score', '_inputs', '_keyframes', '_keyframe_ticks'
+
+    def __init__(self, seed: int, difficulty: float = 1.0) -> None:
+        # Checked here rather than when saving, after the whole match has been played.
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f'Seed must be between 0 and {MAX_SEED} to be recorded, got {seed}.')
+        self.seed = seed
+        self.difficulty = difficulty
+        self.l_score = self.r_score = 0
+        self._inputs = bytearray()
+        self._keyframes = []
+        self._keyframe_ticks = []
+
+    def __len__(self) -> int:
+        return len(self._inputs)
+
+    def record(self, actions: tuple) -> None:
+        # Called once for every tick the engine ran.
+        self._inputs.append(CODES[actions[0]] | CODES[actions[1]] << 2)
+
+    def finish(self, engine: PongEngine) -> None:
+        self.l_score, self.r_score = engine.l_score, engine.r_score
+
+    def actions(self, tick: int) -> tuple:
+        return ACTIONS[self._inputs[tick]]
+
+    def save(self, path: str) -> None:
+        inputs = self._inputs + b'\0' * (len(self._inputs) % 2)
+        packed = bytes(low | high << 4 for low, high in zip(inputs[0::2], inputs[1::2]))
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.seed, self.difficulty, len(self._inputs),
+                                self.l_score, self.r_score))
+            f.write(zlib.compress(packed, 9))
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            magic, version, seed, difficulty, ticks, l_score, r_score = HEADER.unpack_from(data)
+            packed = zlib.decompress(data[HEADER.size:])
+        except (struct.error, zlib.error):
+            raise ValueError(f'{path!r} is not a Pong replay.') from None
+        if magic != MAGIC or version != VERSION or len(packed) != (ticks + 1) // 2:
+            raise ValueError(f'{path!r} is not a Pong replay.')
+
+        replay = cls(seed, difficulty)
+        replay.l_score, replay.r_score = l_score, r_score
+        inputs = bytearray(len(packed) * 2)
+        inputs[0::2] = bytes(byte & 0x0f for byte in packed)
+        inputs[1::2] = bytes(byte >> 4 for byte in packed)
+        replay._inputs = inputs[:ticks]
+        return replay
+
+    def seek(self, tick: int) -> PongEngine:
+        # The engine state after tick ticks, resumed from the closest keyframe before it.
+        tick = max(0, min(tick, len(self._inputs)))
+        engine = PongEngine(self.seed, self.difficulty)
+        position = bisect.bisect_right(self._keyframe_ticks, tick)
+        if position:
+            engine.restore(self._keyframes[position - 1])
+
+        inputs = self._inputs
+        step = engine.step
+        last_keyframe = self._keyframe_ticks[-1] if self._keyframe_ticks else -1
+        for index in range(engine.frame, tick):
+            if index > last_keyframe and not index % KEYFRAME_INTERVAL:
+                self._keyframe_ticks.append(index)
+                self._keyframes.append(engine.snapshot())
+                last_keyframe = index
+            step(ACTIONS[inputs[index]])
+        return engine
+
+    def play(self) -> PongEngine:
+        # Re-simulates the whole match, the engine is left on its final tick.
+        engine = self.seek(len(self._inputs))
+        engine.step()
+        return engine
+
+    def verify(self) -> bool:
+        engine = self.play()
+        return (engine.l_score, engine.r_score) == (self.l_score, self.r_score)
+
+    def rallies(self, min_hits: int = 1):
+        # Yields (start tick, end tick, paddle hits) of every rally with at least min_hits hits.
+        engine = PongEngine(self.seed, self.difficulty)
+        start = hits = 0
+        score = 0
+        for index, code in enumerate(self._inputs):
+            direction = engine.ball_dx > 0
+            engine.step(ACTIONS[code])
+            if engine.l_score + engine.r_score != score:
+                score = engine.l_score + engine.r_score
+                if hits >= min_hits:
+                    yield start, index + 1, hits
+                start, hits = index + 1, 0
+            elif (engine.ball_dx > 0) != direction:
+                hits += 1
+
+
+def seed_type(value: str) -> int:
+    # argparse type for a seed that fits the replay header.
+    seed = int(value)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f'must be between 0 and {MAX_SEED}, got {seed}')
+    return seed
+
+
+seed_type.__name__ = 'integer'
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Pong replay tools.')
+    parser.add_argument('command', choices=('info', 'verify', 'rallies'))
+    parser.add_argument('replay', help='replay file, as written by pong_game.py --record')
+    parser.add_argument('--min-hits', type=int, default=4, help='rallies: minimum paddle hits (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    try:
+        replay = Replay.load(args.replay)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    seconds = len(replay) * PongEngine.TICK
+    print(f'Seed {replay.seed}, speed x{replay.difficulty:g}, {len(replay)} ticks ({seconds:.1f}s), '
+          f'score {replay.l_score}-{replay.r_score}.')
+
+    start = time.perf_counter()
+    if args.command == 'verify':
+        print('Replay verified.' if replay.verify() else 'Replay does not match its recorded score.')
+    elif args.command == 'rallies':
+        for first, last, hits in replay.rallies(args.min_hits):
+            print(f'  {first * PongEngine.TICK:7.1f}s - {last * PongEngine.TICK:7.1f}s  {hits} hits')
+    else:
+        return
+
+    elapsed = time.perf_counter() - start
+    print(f'Simulated in {elapsed:.3f}s, {seconds / elapsed:.0f}x real time.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Round-robin Pong tournaments between paddle controllers.
+
+A controller is a picklable callable, controller(engine, side) -> UP, STAY
+or DOWN, called once per frame with the headless PongEngine and its side,
+'l' or 'r'. Every pair of controllers plays the given number of games on
+each side, matches are spread over a ProcessPoolExecutor in chunks, and
+the results are folded in match order into win-rate and Elo tables, so a
+tournament gives the same tables for the same seed and any worker count.
+
+Usage:
+    python pong_tournament.py -g 200 -w 8
+    python pong_tournament.py track lazy incoming -g 1000 --seed 7
+    python pong_tournament.py easy normal hard -g 500
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Pong%20Game/pong_tournament.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pong_ai import PredictiveController
+from pong_engine import DOWN, STAY, UP, PongEngine
+
+# Elo configurations.
+ELO_START = 1500
+ELO_K = 16
+
+# A match still running after ten minutes of game time is a draw.
+MAX_FRAMES = round(10 * 60 / PongEngine.TICK)
+
+
+def _paddle_y(engine: PongEngine, side: str) -> int:
+    return engine.l_paddle_y if side == 'l' else engine.r_paddle_y
+
+
+def _toward(engine: PongEngine, side: str, target: float, dead_zone: int) -> int:
+    offset = target - _paddle_y(engine, side)
+    if offset > dead_zone:
+        return UP
+    if offset < -dead_zone:
+        return DOWN
+    return STAY
+
+
+def stay(engine: PongEngine, side: str) -> int:
+    return STAY
+
+
+def track(engine: PongEngine, side: str) -> int:
+    return _toward(engine, side, engine.ball_y, engine.STEP_SIZE // 2)
+
+
+def lazy(engine: PongEngine, side: str) -> int:
+    return _toward(engine, side, engine.ball_y, engine.PADDLE_HALF)
+
+
+def incoming(engine: PongEngine, side: str) -> int:
+    # Tracks the ball only while it comes this way, otherwise returns to the centre.
+    approaching = engine.ball_dx < 0 if side == 'l' else engine.ball_dx > 0
+    return _toward(engine, side, engine.ball_y if approaching else 0, engine.STEP_SIZE // 2)
+
+
+CONTROLLERS = {
+    'stay': stay,
+    'track': track,
+    'lazy': lazy,
+    'incoming': incoming,
+    'easy': PredictiveController.level('easy', seed=1),
+    'normal': PredictiveController.level('normal', seed=1),
+    'hard': PredictiveController.level('hard', seed=1)
+}
+
+
+def play_match(left, right, seed) -> tuple:
+    # Plays one match to PongEngine.MAX_POINTS, returns (l_score, r_score, frames).
+    engine = PongEngine(seed)
+    step = engine.step
+    while step((left(engine, 'l'), right(engine, 'r'))):
+        if engine.frame >= MAX_FRAMES:
+            break
+    return engine.l_score, engine.r_score, engine.frame
+
+
+def _play(task: tuple) -> tuple:
+    left, right, seed = task
+    return play_match(left, right, seed)
+
+
+class Tournament:
+
+    def __init__(self, controllers: dict) -> None:
+        self.controllers = controllers
+        self.ratings = dict.fromkeys(controllers, float(ELO_START))
+        self.records = {name: {'wins': 0, 'losses': 0, 'draws': 0, 'points': 0} for name in controllers}
+        self.matches = 0
+        self.frames = 0
+        self.elapsed = 0.0
+
+    def schedule(self, games: int, seed: int = 0) -> list:
+        # (left name, right name, seed) for every ordered pair, so both play each side.
+        matches = [pair for pair in itertools.permutations(self.controllers, 2) for _ in range(games)]
+        return [(left, right, seed + i) for i, (left, right) in enumerate(matches)]
+
+    def __record(self, left: str, right: str, result: tuple) -> None:
+        l_score, r_score, frames = result
+        self.matches += 1
+        self.frames += frames
+        self.records[left]['points'] += l_score
+        self.records[right]['points'] += r_score
+
+        if l_score == r_score:
+            outcome = 0.5
+            self.records[left]['draws'] += 1
+            self.records[right]['draws'] += 1
+        else:
+            outcome = float(l_score > r_score)
+            winner, loser = (left, right) if outcome else (right, left)
+            self.records[winner]['wins'] += 1
+            self.records[loser]['losses'] += 1
+
+        expected = 1 / (1 + 10 ** ((self.ratings[right] - self.ratings[left]) / 400))
+        self.ratings[left] += ELO_K * (outcome - expected)
+        self.ratings[right] -= ELO_K * (outcome - expected)
+
+    def __collect(self, schedule: list, results) -> None:
+        for (left, right, _), result in zip(schedule, results):
+            self.__record(left, right, result)
+
+    def run(self, games: int, seed: int = 0, workers: int = None) -> None:
+        schedule = self.schedule(games, seed)
+        tasks = [(self.controllers[left], self.controllers[right], match_seed)
+                 for left, right, match_seed in schedule]
+        workers = workers or os.cpu_count()
+
+        # Large chunks keep the pickling overhead small next to the matches themselves.
+        chunk_size = max(1, len(tasks) // (workers * 8))
+        start = time.perf_counter()
+        if workers == 1:
+            self.__collect(schedule, map(_play, tasks))
+        else:
+            with ProcessPoolExecutor(workers) as executor:
+                self.__collect(schedule, executor.map(_play, tasks, chunksize=chunk_size))
+        self.elapsed += time.perf_counter() - start
+
+    def table(self) -> str:
+        lines = [f'{"Controller":<12} {"Elo":>6} {"Win %":>6} {"Wins":>6} {"Losses":>6} {"Draws":>6} {"Points":>7}']
+        for name in sorted(self.controllers, key=self.ratings.get, reverse=True):
+            record = self.records[name]
+            played = record['wins'] + record['losses'] + record['draws']
+            win_rate = 100 * record['wins'] / played if played else 0.0
+            lines.append(f'{name:<12} {self.ratings[name]:>6.0f} {win_rate:>6.1f} {record["wins"]:>6} '
+                         f'{record["losses"]:>6} {record["draws"]:>6} {record["points"]:>7}')
+        rate = self.frames / self.elapsed if self.elapsed else 0.0
+        lines.append(f'{self.matches} matches, {self.frames} frames in {self.elapsed:.2f}s ({rate:.0f} frames/s).')
+        return '\n'.join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Round-robin Pong tournament between paddle controllers.')
+    parser.add_argument('controllers', nargs='*', metavar='controller',
+                        help=f'controllers to enter, some of {", ".join(CONTROLLERS)} (default: all)')
+    parser.add_argument('-g', '--games', type=int, default=100,
+                        help='games per ordered pair of controllers (default: %(default)s)')
+    parser.add_argument('-w', '--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first match (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    names = list(dict.fromkeys(args.controllers)) or list(CONTROLLERS)
+    unknown = [name for name in names if name not in CONTROLLERS]
+    if unknown:
+        parser.error(f'Unknown controller(s) {", ".join(unknown)}.')
+    if len(names) < 2:
+        parser.error('At least two controllers are needed.')
+
+    tournament = Tournament({name: CONTROLLERS[name] for name in names})
+    tournament.run(args.games, args.seed, args.workers)
+    print(tournament.table())
+
+
+if __name__ == '__main__':
+    main()
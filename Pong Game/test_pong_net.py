@@ -0,0 +1,142 @@
+"""
+Loopback tests of the networked Pong in pong_net.py.
+
+One match is played on 127.0.0.1 by two tracking bots, each connected
+through a proxy that delays every byte by LATENCY in both directions. The
+tests then check the handshake, the decoded state deltas, the paddle
+prediction and the bandwidth of that match.
+
+Usage:
+    python -m unittest test_pong_net
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Pong%20Game/test_pong_net.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import asyncio
+import time
+import unittest
+
+from pong_net import FIELD, FIELDS, PongClient, PongServer
+from pong_replay import MAX_SEED
+from pong_tournament import track
+
+# Largest seed, to cover the whole unsigned WELCOME field.
+SEED = MAX_SEED
+MATCH_SECONDS = 3.0
+LATENCY = 0.05
+
+# "Low KB/s" per client, in bytes a second, each direction.
+BANDWIDTH_BUDGET = 1024
+
+
+async def _pipe(reader, writer, delay: float) -> None:
+    # Forwards bytes in order, each one delay seconds late.
+    loop = asyncio.get_running_loop()
+    try:
+        while data := await reader.read(4096):
+            loop.call_later(delay, writer.write, data)
+    except ConnectionError:
+        pass
+    finally:
+        loop.call_later(delay, writer.close)
+
+
+async def _start_proxy(port: int, delay: float):
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection('127.0.0.1', port)
+        await asyncio.gather(_pipe(client_reader, server_writer, delay),
+                             _pipe(server_reader, client_writer, delay))
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+async def _play() -> dict:
+    server = PongServer(SEED)
+    sent = dict()
+    send_state = server._PongServer__send_state
+
+    def record_state(tick):
+        # Server values as the float32 fields carry them, by tick.
+        sent[tick] = tuple(FIELD.unpack(FIELD.pack(getattr(server.engine, name)))[0] for name in FIELDS)
+        send_state(tick)
+
+    server._PongServer__send_state = record_state
+    listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+    proxy = await _start_proxy(listener.sockets[0].getsockname()[1], LATENCY)
+    proxy_port = proxy.sockets[0].getsockname()[1]
+
+    clients = [PongClient('127.0.0.1', proxy_port, track) for _ in range(2)]
+    start = time.perf_counter()
+    server_task = asyncio.create_task(server.run())
+    client_tasks = [asyncio.create_task(client.run()) for client in clients]
+    await asyncio.sleep(MATCH_SECONDS / 2)
+
+    # The match is full, a third client is turned away.
+    extra = PongClient('127.0.0.1', listener.sockets[0].getsockname()[1])
+    await asyncio.wait_for(extra.run(), 1.0)
+
+    await asyncio.wait([server_task], timeout=MATCH_SECONDS / 2)
+    elapsed = time.perf_counter() - start
+
+    for task in client_tasks + [server_task]:
+        task.cancel()
+    await asyncio.gather(*client_tasks, server_task, return_exceptions=True)
+
+    # Hang up the server side too and let the proxy pass both hang-ups on,
+    # so every connection handler ends on its own.
+    for player in server.players.values():
+        player.writer.close()
+    await asyncio.sleep(4 * LATENCY)
+    for listening in (proxy, listener):
+        listening.close()
+        await listening.wait_closed()
+    return {'server': server, 'clients': clients, 'extra': extra, 'sent': sent, 'elapsed': elapsed}
+
+
+class LoopbackMatchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.match = asyncio.run(_play())
+
+    def test_handshake(self) -> None:
+        clients = self.match['clients']
+        self.assertEqual(sorted(client.side for client in clients), ['l', 'r'])
+        for client in clients:
+            self.assertEqual(client.seed, SEED)
+            self.assertTrue(0 <= client.seed <= MAX_SEED)
+            self.assertTrue(client.started)
+
+        extra = self.match['extra']
+        self.assertIsNone(extra.side)
+        self.assertTrue(extra.finished)
+
+    def test_state_deltas_match_server(self) -> None:
+        sent = self.match['sent']
+        for client in self.match['clients']:
+            self.assertTrue(client._snapshots)
+            for tick, values in zip(client._ticks, client._snapshots):
+                self.assertEqual(values, sent[tick], f'client {client.side} at tick {tick}')
+
+    def test_prediction_converges(self) -> None:
+        for client in self.match['clients']:
+            corrections = sorted(client.corrections)
+            self.assertGreater(len(corrections), 10)
+            # Reconciliation replays the unacknowledged inputs, so it agrees with
+            # the server unless an input was dropped as too far ahead.
+            self.assertLess(corrections[len(corrections) // 2], 0.5)
+            self.assertLess(max(list(client.corrections)[-10:]), 0.5)
+
+    def test_bandwidth(self) -> None:
+        elapsed = self.match['elapsed']
+        for client in self.match['clients']:
+            player = self.match['server'].players[client.side]
+            self.assertGreater(player.bytes_sent, 0)
+            self.assertLess(client.bytes_sent / elapsed, BANDWIDTH_BUDGET)
+            self.assertLess(player.bytes_sent / elapsed, BANDWIDTH_BUDGET)
+            self.assertLessEqual(client.bytes_received, player.bytes_sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Per-frame timings for the turtle game loops.
+
+A game loop calls mark(phase) after each part of a frame and end_frame()
+once the frame is done; every mark charges the time since the previous
+mark to that phase, so the phases of a frame add up to the whole frame,
+waiting included. The last FRAMES frames are kept in a flat ring buffer of
+floats, along with one load value per frame (the snake length, the ball
+speed) to line frame-time spikes up with what the game was doing.
+
+The games keep None instead of a profiler when profiling is off, so a
+disabled profiler costs one comparison per phase.
+
+Optionally the first frames run under cProfile, and an Overlay writes the
+FPS and frame times on the screen a few times a second.
+
+Every game folder runs on its own, so this file is kept as an identical
+copy in Pong Game/frame_profiler.py; change both together.
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Snake%20Game/frame_profiler.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import cProfile
+import csv
+import json
+import pstats
+from array import array
+from time import perf_counter
+from turtle import Turtle
+
+
+class FrameProfiler:
+
+    # Frames kept in the ring buffer, a minute at 60 FPS.
+    FRAMES = 3600
+
+    # Functions printed from a cProfile capture.
+    STATS_LINES = 20
+
+    def __init__(self, phases: tuple, load: str = 'load', frames: int = None,
+                 cprofile_frames: int = 0, cprofile_file: str = None) -> None:
+        self.phases = tuple(phases)
+        self.load = load
+        self.size = frames or self.FRAMES
+        self.count = 0
+
+        # Row of a frame: one duration per phase in seconds, then the load value.
+        # One row more than the frames kept holds the frame in progress.
+        self._columns = {phase: i for i, phase in enumerate(self.phases)}
+        self._width = len(self.phases) + 1
+        self._rows = self.size + 1
+        self._buffer = array('d', bytes(8 * self._width * self._rows))
+        self._row = 0
+        self._last = perf_counter()
+
+        self._cprofile_frames = cprofile_frames
+        self._cprofile_file = cprofile_file
+        self._cprofile = cProfile.Profile() if cprofile_frames else None
+
+    def start(self) -> None:
+        # Starts timing from now, e.g. once the game leaves its start screen.
+        self._last = perf_counter()
+        if self._cprofile:
+            self._cprofile.enable()
+
+    def mark(self, phase: str) -> None:
+        now = perf_counter()
+        self._buffer[self._row + self._columns[phase]] += now - self._last
+        self._last = now
+
+    def end_frame(self, load: float = 0.0) -> None:
+        self._buffer[self._row + self._width - 1] = load
+        self.count += 1
+        self._row = (self.count % self._rows) * self._width
+        for i in range(self._row, self._row + self._width):
+            self._buffer[i] = 0.0
+
+        if self._cprofile and self.count == self._cprofile_frames:
+            self.__finish_cprofile()
+
+    def __finish_cprofile(self) -> None:
+        self._cprofile.disable()
+        if self._cprofile_file:
+            self._cprofile.dump_stats(self._cprofile_file)
+        print(f'cProfile of the first {self.count} frames:')
+        pstats.Stats(self._cprofile).sort_stats('cumulative').print_stats(self.STATS_LINES)
+        self._cprofile = None
+
+    def frames(self, last: int = None):
+        # Yields (frame number, phase durations, load) of the buffered frames, oldest first.
+        kept = min(self.count, self.size)
+        last = kept if last is None else min(last, kept)
+        width = self._width
+        for frame in range(self.count - last, self.count):
+            row = (frame % self._rows) * width
+            yield frame, self._buffer[row:row + width - 1], self._buffer[row + width - 1]
+
+    def summary(self, last: int = None) -> dict:
+        # Mean, 95th percentile and max in milliseconds of every phase and of the whole frame.
+        columns = {phase: [] for phase in self.phases + ('frame',)}
+        for _, durations, _ in self.frames(last):
+            for phase, duration in zip(self.phases, durations):
+                columns[phase].append(duration * 1000)
+            columns['frame'].append(sum(durations) * 1000)
+
+        summary = dict()
+        for phase, values in columns.items():
+            values.sort()
+            if values:
+                summary[phase] = {'mean': sum(values) / len(values),
+                                  'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                                  'max': values[-1]}
+        return summary
+
+    def fps(self, last: int = 60) -> float:
+        total = sum(sum(durations) for _, durations, _ in self.frames(last))
+        return min(self.count, self.size, last) / total if total else 0.0
+
+    def report(self) -> str:
+        lines = [f'{self.count} frames, {min(self.count, self.size)} kept.',
+                 f'{"Phase":<10} {"Mean ms":>8} {"p95 ms":>8} {"Max ms":>8}']
+        for phase, stats in self.summary().items():
+            lines.append(f'{phase:<10} {stats["mean"]:>8.2f} {stats["p95"]:>8.2f} {stats["max"]:>8.2f}')
+        return '\n'.join(lines)
+
+    def save(self, path: str) -> None:
+        # Writes the buffered frames in milliseconds, as CSV for a .csv path and JSON otherwise.
+        header = ('frame',) + self.phases + ('total', self.load)
+        rows = [(frame, *(round(duration * 1000, 4) for duration in durations),
+                 round(sum(durations) * 1000, 4), load)
+                for frame, durations, load in self.frames()]
+
+        with open(path, 'w', newline='') as f:
+            if path.lower().endswith('.csv'):
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(rows)
+            else:
+                json.dump({'phases': self.phases, 'load': self.load, 'summary': self.summary(),
+                           'frames': [dict(zip(header, row)) for row in rows]}, f, indent=1)
+
+
+class Overlay:
+
+    # Overlay configurations, the text is rewritten at most every INTERVAL seconds.
+    INTERVAL = 0.5
+    FONT = ('Courier', 10, 'normal')
+    FONT_COLOR = 'yellow'
+
+    def __init__(self, profiler: FrameProfiler, x: int, y: int) -> None:
+        self._profiler = profiler
+        self._turtle = Turtle(visible=False)
+        self._turtle.up()
+        self._turtle.goto(x, y)
+        self._turtle.color(self.FONT_COLOR)
+        self._next = 0.0
+
+    def refresh(self) -> None:
+        now = perf_counter()
+        if now < self._next:
+            return
+        self._next = now + self.INTERVAL
+
+        profiler = self._profiler
+        frame = profiler.summary(60).get('frame')
+        if frame:
+            self._turtle.clear()
+            self._turtle.write(f'{profiler.fps():5.1f} FPS  {frame["mean"]:5.1f} ms avg  {frame["max"]:5.1f} ms max',
+                               align='left', font=self.FONT)
@@ -0,0 +1,186 @@
+"""
+Headless batch of Snake games for reinforcement learning.
+
+VecSnakeEnv steps N independent games at once with the rules of
+snake_game.py: the same field, walls, start position and food area, the
+no-reverse turn rule, growth on the move after eating and food that never
+spawns on the snake. Every game lives in rows of NumPy arrays: a board of
+cell values, which is also the observation, a ring buffer of body cells,
+and the head, heading, length and pending growth. A step is a fixed
+sequence of array operations over all games, with no per-game Python
+loop; only games that ate or died do the extra work of placing food or
+starting over.
+
+Actions are headings, RIGHT, UP, LEFT or DOWN, or KEEP for no key press;
+a reversing action is ignored like the game ignores the opposite arrow
+key. Eating rewards 1 and dying -1, and a game that dies is started over
+in the same step.
+
+Needs NumPy, which the turtle game itself does not.
+
+Usage:
+    python snake_env.py --envs 1000 --steps 2000
+
+:URL: https://github.com/nknantha/PyScripts/tree/main/Snake%20Game/snake_env.py
+:Author: NanthaKumar<https://github.com/nknantha>
+:Date: 2026/10/18
+"""
+import argparse
+import time
+
+import numpy as np
+
+from snake_game import SCREEN_HEIGHT, SCREEN_WIDTH, STEP_SIZE, Food
+
+RIGHT, UP, LEFT, DOWN, KEEP = range(5)
+
+# Cell values of the board.
+EMPTY, BODY, HEAD, FOOD = range(4)
+
+# Cell step of each heading, in the order of the actions.
+STEP_X = np.array([1, 0, -1, 0], dtype=np.int32)
+STEP_Y = np.array([0, 1, 0, -1], dtype=np.int32)
+
+# The head dies on a cell at SnakeGame.x_range or y_range, so the board is the cells inside.
+MAX_X = (SCREEN_WIDTH // 2 - STEP_SIZE - 1) // STEP_SIZE
+MAX_Y = (SCREEN_HEIGHT // 2 - STEP_SIZE - 1) // STEP_SIZE
+WIDTH, HEIGHT = 2 * MAX_X + 1, 2 * MAX_Y + 1
+CELLS = WIDTH * HEIGHT
+
+# Start of every game, tail to head, heading right.
+START = ((-2, 0), (-1, 0), (0, 0))
+
+
+def to_index(x, y):
+    # Flat board index of a cell, works on arrays.
+    return (y + MAX_Y) * WIDTH + x + MAX_X
+
+
+FOOD_CELLS = np.array([to_index(x, y) for x, y in Food.area()], dtype=np.int32)
+START_CELLS = np.array([to_index(x, y) for x, y in START], dtype=np.int32)
+
+
+class VecSnakeEnv:
+
+    def __init__(self, envs: int, seed=None) -> None:
+        self.envs = envs
+        self._rng = np.random.default_rng(seed)
+        self._rows = np.arange(envs)
+
+        self.board = np.zeros((envs, CELLS), dtype=np.int8)
+        # Body cells, tail to head, in a ring buffer that ends at head_pos.
+        self._body = np.zeros((envs, CELLS), dtype=np.int32)
+        self._head_pos = np.zeros(envs, dtype=np.int32)
+        self.head_x = np.zeros(envs, dtype=np.int32)
+        self.head_y = np.zeros(envs, dtype=np.int32)
+        self.heading = np.zeros(envs, dtype=np.int32)
+        self.length = np.zeros(envs, dtype=np.int32)
+        self._growth = np.zeros(envs, dtype=np.int32)
+        self.food = np.zeros(envs, dtype=np.int32)
+        self.scores = np.zeros(envs, dtype=np.int32)
+        self.final_scores = np.zeros(envs, dtype=np.int32)
+        self.reset()
+
+    def reset(self, rows=None) -> np.ndarray:
+        # Starts the given games over, all of them by default, and returns the observations.
+        rows = self._rows if rows is None else rows
+        self.board[rows] = EMPTY
+        self._body[rows, :len(START)] = START_CELLS
+        self._head_pos[rows] = len(START) - 1
+        self.head_x[rows], self.head_y[rows] = START[-1]
+        self.heading[rows] = RIGHT
+        self.length[rows] = len(START)
+        self._growth[rows] = 0
+        self.scores[rows] = 0
+        self.board[rows[:, None], START_CELLS[:-1]] = BODY
+        self.board[rows, START_CELLS[-1]] = HEAD
+        self.__place_food(rows)
+        return self.observations()
+
+    def __place_food(self, rows: np.ndarray) -> None:
+        # Uniform over the empty cells of the food area: the largest random key among them wins.
+        if not len(rows):
+            return
+        free = self.board[rows[:, None], FOOD_CELLS] == EMPTY
+        keys = self._rng.random(free.shape, dtype=np.float32)
+        keys[~free] = -1.0
+        choice = keys.argmax(axis=1)
+        has_food = free[np.arange(len(rows)), choice]
+
+        # A snake filling the whole food area leaves no food, like the game.
+        self.food[rows] = np.where(has_food, FOOD_CELLS[choice], -1)
+        fed = rows[has_food]
+        self.board[fed, self.food[fed]] = FOOD
+
+    def observations(self) -> np.ndarray:
+        # (envs, HEIGHT, WIDTH) view of the boards, row 0 is the bottom wall side. Copy it to keep it.
+        return self.board.reshape(self.envs, HEIGHT, WIDTH)
+
+    def step(self, actions) -> tuple:
+        # Moves every game one cell, returns (observations, rewards, dones).
+        rows = self._rows
+        actions = np.asarray(actions, dtype=np.int32)
+
+        # Snake._change_direction: no key or the opposite heading keeps the current one.
+        turn = (actions < KEEP) & (actions != (self.heading + 2) % 4)
+        self.heading = np.where(turn, actions, self.heading)
+        self.head_x += STEP_X[self.heading]
+        self.head_y += STEP_Y[self.heading]
+
+        # Growing keeps the tail, otherwise the tail cell is freed before the head moves in.
+        growing = self._growth > 0
+        tail = self._body[rows, (self._head_pos - self.length + 1) % CELLS]
+        self.board[rows, tail] *= growing
+        self.length += growing
+        self._growth -= growing
+
+        wall = (np.abs(self.head_x) > MAX_X) | (np.abs(self.head_y) > MAX_Y)
+        cell = np.where(wall, 0, to_index(self.head_x, self.head_y))
+        target = self.board[rows, cell]
+        dones = wall | (target == BODY)
+        eaten = ~dones & (cell == self.food)
+
+        self.board[rows, self._body[rows, self._head_pos]] = BODY
+        self._head_pos = (self._head_pos + 1) % CELLS
+        self._body[rows, self._head_pos] = cell
+        self.board[rows, cell] = HEAD
+
+        self._growth += eaten
+        self.scores += eaten
+        rewards = eaten.astype(np.float32) - dones
+
+        if eaten.any():
+            self.__place_food(rows[eaten])
+        if dones.any():
+            finished = rows[dones]
+            self.final_scores[finished] = self.scores[finished]
+            self.reset(finished)
+        return self.observations(), rewards, dones
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the batch Snake environment with random actions.')
+    parser.add_argument('--envs', type=int, default=1000, help='games stepped together (default: %(default)s)')
+    parser.add_argument('--steps', type=int, default=2000, help='steps of the batch (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the food and actions (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    env = VecSnakeEnv(args.envs, args.seed)
+    rng = np.random.default_rng(args.seed)
+    actions = rng.integers(0, KEEP + 1, size=(args.steps, args.envs), dtype=np.int32)
+
+    episodes = rewards = 0
+    start = time.perf_counter()
+    for step_actions in actions:
+        _, step_rewards, dones = env.step(step_actions)
+        episodes += int(dones.sum())
+        rewards += int((step_rewards > 0).sum())
+    elapsed = time.perf_counter() - start
+
+    env_steps = args.envs * args.steps
+    print(f'{env_steps} env-steps in {elapsed:.2f}s, {env_steps / elapsed:,.0f} env-steps/s, '
+          f'{episodes} games over, {rewards} food eaten.')
+
+
+if __name__ == '__main__':
+    main()
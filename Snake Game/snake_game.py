@@ -5,13 +5,15 @@ Snake game using turtle module.
 :Author: NanthaKumar<https://github.com/nknantha>
 :Date: 2021/09/26
 """
-
+import argparse
+import itertools
+from collections import Counter, deque
 from random import randrange
 from time import sleep
 from turtle import Turtle, Screen
-from typing import Union, Tuple
+from typing import Tuple
 
-COLORTUPLE = Union[str, Tuple[int, int, int]]
+from frame_profiler import FrameProfiler, Overlay
 
 # GAME Configurations.
 SCREEN_WIDTH, SCREEN_HEIGHT = 700, 500
@@ -20,6 +22,45 @@ SCREEN_TITLE = 'Snake Game'
 STEP_SIZE = 20
 
 
+def to_cell(x: float, y: float) -> Tuple[int, int]:
+    # Grid cell of a screen position.
+    return round(x / STEP_SIZE), round(y / STEP_SIZE)
+
+
+class FreeCells:
+    __slots__ = '_area', '_cells', '_index'
+
+    def __init__(self, cells) -> None:
+        # Empty cells of the area, a dense list to sample from and the list index of each cell.
+        # Removal swaps the last cell into the hole, so every operation is O(1).
+        self._cells = list(cells)
+        self._area = frozenset(self._cells)
+        self._index = {cell: i for i, cell in enumerate(self._cells)}
+
+    def __contains__(self, cell) -> bool:
+        return cell in self._index
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def add(self, cell: Tuple[int, int]) -> None:
+        if cell in self._area and cell not in self._index:
+            self._index[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def remove(self, cell: Tuple[int, int]) -> None:
+        i = self._index.pop(cell, None)
+        if i is None:
+            return
+        last = self._cells.pop()
+        if i < len(self._cells):
+            self._cells[i] = last
+            self._index[last] = i
+
+    def sample(self) -> Tuple[int, int]:
+        return self._cells[randrange(len(self._cells))]
+
+
 class Food(Turtle):
 
     # Food Configuration.
@@ -30,8 +71,9 @@ class Food(Turtle):
     FOOD_H_RANGE = ((int(SCREEN_HEIGHT // 2) // STEP_SIZE) - 2) * STEP_SIZE
     STEP_SIZE = STEP_SIZE
 
-    def __init__(self) -> None:
+    def __init__(self, free_cells: FreeCells) -> None:
         super().__init__()
+        self._free_cells = free_cells
         self.shape(self.FOOD_SHAPE)
         self.shapesize(self.FOOD_SIZE, self.FOOD_SIZE)
         self.color(self.FOOD_COLOR)
@@ -39,11 +81,21 @@ class Food(Turtle):
         self.speed(0)
         self.refresh()
 
+    @classmethod
+    def area(cls):
+        # Cells the food can spawn on.
+        for x in range(-cls.FOOD_W_RANGE, cls.FOOD_W_RANGE, cls.STEP_SIZE):
+            for y in range(-cls.FOOD_H_RANGE, cls.FOOD_H_RANGE, cls.STEP_SIZE):
+                yield to_cell(x, y)
+
     def refresh(self) -> None:
-        new_x = randrange(-self.FOOD_W_RANGE, self.FOOD_W_RANGE, self.STEP_SIZE)
-        new_y = randrange(-self.FOOD_H_RANGE, self.FOOD_H_RANGE, self.STEP_SIZE)
-        # print(new_x, new_y)
-        self.goto(new_x, new_y)
+        # Spawns on a random empty cell, a snake filling the whole area leaves no food.
+        if not self._free_cells:
+            self.cell = None
+            self.hideturtle()
+            return
+        self.cell = self._free_cells.sample()
+        self.goto(self.cell[0] * self.STEP_SIZE, self.cell[1] * self.STEP_SIZE)
 
 
 class InfoBoard:
@@ -76,65 +128,106 @@ class InfoBoard:
 
 
 class Snake:
-    __slots__ = '_segments', 'head'
+    __slots__ = ('_canvas', '_segments', '_body', 'head_cell', '_cells', '_collided', '_heading', '_growth',
+                 '_free_cells')
 
-    # Snake Configurations.
+    # Snake Configurations, segments are canvas circles of these radii.
     STEP_SIZE = STEP_SIZE
-    HEAD_SIZE = 0.9
-    BODY_SIZE = 0.8
+    HEAD_RADIUS = 9
+    BODY_RADIUS = 8
 
     HEAD_COLOR = 'green'
     BODY_COLOR = 'white'
     COLLISION_COLOR = 'red'
 
-    HEAD_SHAPE = 'circle'
-    BODY_SHAPE = 'circle'
+    # Grid cell step of each heading.
+    STEPS = {0: (1, 0), 90: (0, 1), 180: (-1, 0), 270: (0, -1)}
 
-    def __init__(self) -> None:
-        self._segments = []
+    def __init__(self, canvas, free_cells: FreeCells = None) -> None:
+        # Canvas items and their grid cells, head first. A move only touches the two ends.
+        self._canvas = canvas
+        self._segments = deque()
+        self._body = deque()
+        self._heading = 0
+        self._growth = 0
         self._create_segments()
-        self.head = self._segments[0]
 
-    @staticmethod
-    def __create_turtle(shape: str, size: Union[int, float], color: COLORTUPLE) -> Turtle:
-        new_turtle = Turtle(shape=shape)
-        new_turtle.up()
-        new_turtle.shapesize(size, size)
-        new_turtle.color(color)
-        new_turtle.speed(0)
-        return new_turtle
+        # Segments in each grid cell, kept up to date by the moves so collisions are lookups.
+        self._cells = Counter(self._body)
+        self.head_cell = self._body[0]
+        self._collided = False
+
+        # Empty cells for the food, the snake takes its cells out as it enters them.
+        self._free_cells = free_cells
+        if free_cells is not None:
+            for cell in self._body:
+                free_cells.remove(cell)
+
+    def __place(self, item: int, cell: Tuple[int, int], radius: int, color: str) -> None:
+        # Canvas y points down.
+        x, y = cell[0] * self.STEP_SIZE, -cell[1] * self.STEP_SIZE
+        self._canvas.coords(item, x - radius, y - radius, x + radius, y + radius)
+        self._canvas.itemconfigure(item, fill=color, outline=color)
+
+    def __create_segment(self, cell: Tuple[int, int], radius: int, color: str) -> int:
+        item = self._canvas.create_oval(0, 0, 0, 0)
+        self.__place(item, cell, radius, color)
+        return item
 
     def _create_segments(self) -> None:
         # Head creation.
-        self._segments.append(self.__create_turtle(self.HEAD_SHAPE, self.HEAD_SIZE, self.HEAD_COLOR))
+        self._segments.append(self.__create_segment((0, 0), self.HEAD_RADIUS, self.HEAD_COLOR))
+        self._body.append((0, 0))
 
         # Body creation.
         for i in range(1, 3):
-            new_turtle = self.__create_turtle(self.BODY_SHAPE, self.BODY_SIZE, self.BODY_COLOR)
-            new_turtle.bk(self.STEP_SIZE * i)
-            self._segments.append(new_turtle)
+            self._segments.append(self.__create_segment((-i, 0), self.BODY_RADIUS, self.BODY_COLOR))
+            self._body.append((-i, 0))
 
     def _change_direction(self, deg: int) -> None:
-        if int((self.head.heading() + 180) % 360) != (deg % 360):
-            self.head.setheading(deg)
+        if (self._heading + 180) % 360 != deg % 360:
+            self._heading = deg
 
     def _forward_segments(self) -> None:
-        for j in range(len(self._segments) - 1, 0, -1):
-            new_x = self._segments[j - 1].xcor()
-            new_y = self._segments[j - 1].ycor()
-            self._segments[j].goto(new_x, new_y)
-        self.head.fd(self.STEP_SIZE)
+        step_x, step_y = self.STEPS[self._heading]
+        head_x, head_y = self.head_cell
+        self.head_cell = (head_x + step_x, head_y + step_y)
+
+        # Growing keeps the tail, otherwise the tail item is reused as the new head.
+        if self._growth:
+            self._growth -= 1
+            new_head = self._canvas.create_oval(0, 0, 0, 0)
+        else:
+            new_head = self._segments.pop()
+            tail_cell = self._body.pop()
+            self._cells[tail_cell] -= 1
+            if not self._cells[tail_cell]:
+                del self._cells[tail_cell]
+                if self._free_cells is not None:
+                    self._free_cells.add(tail_cell)
+
+        self.__place(self._segments[0], self._body[0], self.BODY_RADIUS, self.BODY_COLOR)
+        self.__place(new_head, self.head_cell, self.HEAD_RADIUS, self.HEAD_COLOR)
+        self._segments.appendleft(new_head)
+        self._body.appendleft(self.head_cell)
+
+        self._cells[self.head_cell] += 1
+        if self._free_cells is not None:
+            self._free_cells.remove(self.head_cell)
+        self._collided = self._cells[self.head_cell] > 1
+
+    def __len__(self) -> int:
+        return len(self._segments) + self._growth
 
     def add_segment(self) -> None:
-        new_turtle = self.__create_turtle(self.BODY_SHAPE, self.BODY_SIZE, self.BODY_COLOR)
-        new_turtle.goto(self._segments[-1].pos())
-        self._segments.append(new_turtle)
+        # The new segment appears by keeping the tail in place on the next move.
+        self._growth += 1
 
     def down(self) -> None:
         self._change_direction(270)
 
     def head_collision(self) -> None:
-        self.head.color(self.COLLISION_COLOR)
+        self._canvas.itemconfigure(self._segments[0], fill=self.COLLISION_COLOR, outline=self.COLLISION_COLOR)
 
     def left(self) -> None:
         self._change_direction(180)
@@ -146,21 +239,24 @@ class Snake:
         self._change_direction(0)
 
     def segment_collision(self) -> bool:
-        for i in range(1, len(self._segments)):
-            if round(self.head.xcor(), 2) == round(self._segments[i].xcor(), 2) \
-                    and round(self.head.ycor(), 2) == round(self._segments[i].ycor(), 2):
-                self._segments[i].color(self.COLLISION_COLOR)
-                return True
-        return False
+        if not self._collided:
+            return False
+
+        # Game over, the segment that was hit is only looked up to color it.
+        for cell, segment in zip(itertools.islice(self._body, 1, None), itertools.islice(self._segments, 1, None)):
+            if cell == self.head_cell:
+                self._canvas.itemconfigure(segment, fill=self.COLLISION_COLOR, outline=self.COLLISION_COLOR)
+                break
+        return True
 
     def up(self) -> None:
         self._change_direction(90)
 
 
 class SnakeGame:
-    __slots__ = 'screen', 'x_range', 'y_range', 'food', 'snake', 'infoboard'
+    __slots__ = 'screen', 'x_range', 'y_range', 'food', 'snake', 'infoboard', 'profiler', 'overlay'
 
-    def __init__(self) -> None:
+    def __init__(self, profiler: FrameProfiler = None, overlay: bool = False) -> None:
 
         # Screen setup.
         self.screen = Screen()
@@ -177,10 +273,15 @@ class SnakeGame:
         self.screen.colormode(255)
 
         # Game objects setup.
-        self.food = Food()
-        self.snake = Snake()
+        free_cells = FreeCells(Food.area())
+        self.snake = Snake(self.screen.getcanvas(), free_cells)
+        self.food = Food(free_cells)
         self.infoboard = InfoBoard()
 
+        # Profiling setup, None when off so the game loop skips it.
+        self.profiler = profiler
+        self.overlay = Overlay(profiler, -self.x_range, -self.y_range - 5) if profiler and overlay else None
+
     def __hold_game(self):
         turtle = Turtle(visible=False)
         turtle.up()
@@ -201,12 +302,11 @@ class SnakeGame:
         turtle.clear()
 
     def _food_collision(self) -> bool:
-        return round(self.food.xcor(), 2) == round(self.snake.head.xcor(), 2) \
-               and round(self.food.ycor(), 2) == round(self.snake.head.ycor(), 2)
+        return self.food.cell == self.snake.head_cell
 
     def _wall_collision(self) -> bool:
-        return abs(self.snake.head.xcor()) >= self.x_range \
-               or abs(self.snake.head.ycor()) >= self.y_range
+        x, y = self.snake.head_cell
+        return abs(x * STEP_SIZE) >= self.x_range or abs(y * STEP_SIZE) >= self.y_range
 
     def _enable_keys(self) -> None:
         self.screen.onkey(self.snake.up, 'Up')
@@ -230,8 +330,14 @@ class SnakeGame:
 
         self.__hold_game()
 
+        profiler = self.profiler
+        if profiler:
+            profiler.start()
+
         while game_on:
             self.screen.update()
+            if profiler:
+                profiler.mark('update')
 
             # Food collision.
             if self._food_collision():
@@ -241,18 +347,42 @@ class SnakeGame:
                 speed *= 0.99
 
             # Wall collision.
-            if self._wall_collision() or self.snake.segment_collision():
+            collided = self._wall_collision() or self.snake.segment_collision()
+            if profiler:
+                profiler.mark('collision')
+            if collided:
                 self.snake.head_collision()
                 game_on = False
                 self.infoboard.game_over()
                 self.screen.update()
             else:
                 self.snake.move()
+            if profiler:
+                profiler.mark('physics')
+                if self.overlay:
+                    self.overlay.refresh()
 
             sleep(speed)
+            if profiler:
+                profiler.mark('sleep')
+                profiler.end_frame(len(self.snake))
 
+        if profiler:
+            print(profiler.report())
         self.screen.exitonclick()
 
 
 if __name__ == '__main__':
-    SnakeGame().run()
+    parser = argparse.ArgumentParser(description='Snake game.')
+    parser.add_argument('--profile', metavar='FILE', help='save per-frame timings to FILE, .csv or .json')
+    parser.add_argument('--overlay', action='store_true', help='show the FPS and frame times on the screen')
+    parser.add_argument('--cprofile', type=int, default=0, metavar='N', help='run the first N frames under cProfile')
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile or args.overlay or args.cprofile:
+        profiler = FrameProfiler(('update', 'collision', 'physics', 'sleep'), load='length',
+                                 cprofile_frames=args.cprofile)
+    SnakeGame(profiler, args.overlay).run()
+    if args.profile:
+        profiler.save(args.profile)